@@ -1,15 +1,23 @@
-from flask import Flask, request, jsonify, render_template, send_file
+from flask import Flask, Request, request, jsonify, render_template, send_file
 from flask_cors import CORS
 import os
-import json
-from werkzeug.utils import secure_filename
 from config import *
 from services.photo_processor import PhotoProcessor
 from services.context_generator import ContextGenerator
 from services.gemini_service import GeminiService
 from services.working_cinematic_generator import WorkingCinematicGenerator as VideoGenerator
+from services.render_jobs import RenderJobQueue, RenderQueueFull
+from services.model_registry import model_registry
+from services.upload_store import UploadStore
+from services.content_hash import is_blob_id
+
+class StreamingUploadRequest(Request):
+    """Write uploaded files straight into the upload store instead of Werkzeug's spooled buffers"""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return upload_store.open_stream(filename)
 
 app = Flask(__name__)
+app.request_class = StreamingUploadRequest
 CORS(app)
 
 # Configure upload settings
@@ -22,16 +30,33 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 os.makedirs(STATIC_FOLDER, exist_ok=True)
 
-# Initialize services
-photo_processor = PhotoProcessor()
-context_generator = ContextGenerator()
-video_generator = VideoGenerator()
-gemini_service = GeminiService()
+# Worker pools (photo preprocessing, segment encoding) start processes from a
+# fork server, which re-imports this module as __mp_main__. Only the server
+# process builds the services and loads models.
+if __name__ != '__mp_main__':
+    # Initialize services
+    upload_store = UploadStore(UPLOAD_FOLDER)
+    photo_processor = PhotoProcessor()
+    context_generator = ContextGenerator()
+    video_generator = VideoGenerator()
+    gemini_service = GeminiService()
+    render_jobs = RenderJobQueue(video_generator.create_video)
+
+    # Load models in the background so the server answers while weights load
+    model_registry.warm_up(WARMUP_MODELS)
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/ready')
+def ready():
+    is_ready = model_registry.is_ready(WARMUP_MODELS)
+    return jsonify({
+        'ready': is_ready,
+        'models': model_registry.status()
+    }), 200 if is_ready else 503
+
 @app.route('/upload', methods=['POST'])
 def upload_photos():
     try:
@@ -42,35 +67,51 @@ def upload_photos():
         if not files or files[0].filename == '':
             return jsonify({'error': 'No files selected'}), 400
         
-        # Process uploaded photos
-        photo_paths = []
+        # Uploaded photos were already hashed and written to the store while
+        # the request was parsed; commit them and skip duplicate content
+        photos = []
+        photo_ids = []
         for file in files:
             if file and file.filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-                filename = secure_filename(file.filename)
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(file_path)
-                photo_paths.append(file_path)
+                try:
+                    photo = upload_store.commit(file.stream)
+                except ValueError as e:
+                    print(f"Skipping upload: {str(e)}")
+                    continue
+                
+                if photo['blob_id'] in photo_ids:
+                    print(f"Skipping duplicate photo {file.filename}")
+                    continue
+                photo['original_name'] = file.filename
+                photos.append(photo)
+                photo_ids.append(photo['blob_id'])
         
-        if not photo_paths:
+        if not photo_ids:
             return jsonify({'error': 'No valid image files uploaded'}), 400
         
+        session_id = upload_store.create_session(photos)
+        
         # Order photos chronologically
-        print(f"Original photo order: {[os.path.basename(p) for p in photo_paths]}")
-        ordered_photo_paths = photo_processor.order_photos(photo_paths)
-        print(f"Chronologically ordered photos: {[os.path.basename(p) for p in ordered_photo_paths]}")
+        original_names = {photo['blob_id']: photo['original_name'] for photo in photos}
+        print(f"Original photo order: {[original_names[p] for p in photo_ids]}")
+        ordered_photo_ids = photo_processor.order_photos(photo_ids)
+        print(f"Chronologically ordered photos: {[original_names[p] for p in ordered_photo_ids]}")
         
         # Generate context using BERT5
-        context = context_generator.generate_context(ordered_photo_paths)
+        context = context_generator.generate_context(ordered_photo_ids)
         
         # Get video plan from Gemini
-        video_plan = gemini_service.plan_video(ordered_photo_paths, context)
+        video_plan = gemini_service.plan_video(ordered_photo_ids, context)
         
         return jsonify({
             'success': True,
-            'photo_count': len(ordered_photo_paths),
+            'session_id': session_id,
+            'photo_count': len(ordered_photo_ids),
             'context': context,
             'video_plan': video_plan,
-            'photo_paths': ordered_photo_paths
+            'photos': [{'blob_id': p, 'original_name': original_names[p]} for p in ordered_photo_ids],
+            # Blob IDs; legacy clients pass these back to /generate_video unchanged
+            'photo_paths': ordered_photo_ids
         })
     
     except Exception as e:
@@ -84,11 +125,23 @@ def generate_video():
         context = data.get('context', '')
         video_plan = data.get('video_plan', {})
         
+        # Without an explicit list, render the photos of an upload session
+        if not photo_paths and data.get('session_id'):
+            session = upload_store.get_session(data['session_id'])
+            if not session:
+                return jsonify({'error': 'Upload session not found'}), 404
+            photo_paths = [photo['blob_id'] for photo in session['photos']]
+        
         if not photo_paths:
             return jsonify({'error': 'No photos provided'}), 400
         
-        # Generate video
-        output_path = video_generator.create_video(
+        # Only blob IDs from /upload are accepted, so clients can never point a render at other files
+        invalid = [photo for photo in photo_paths if not is_blob_id(photo)]
+        if invalid:
+            return jsonify({'error': f'Invalid photo IDs: {invalid[:5]}'}), 400
+        
+        # Queue the render and return immediately; clients poll the job endpoints
+        job_id = render_jobs.submit(
             photo_paths=photo_paths,
             context=context,
             video_plan=video_plan
@@ -96,13 +149,51 @@ def generate_video():
         
         return jsonify({
             'success': True,
-            'video_path': output_path,
-            'download_url': f'/download/{os.path.basename(output_path)}'
-        })
+            'job_id': job_id,
+            'status_url': f'/jobs/{job_id}',
+            'result_url': f'/jobs/{job_id}/result'
+        }), 202
     
+    except RenderQueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = render_jobs.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify({
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'stage': job['stage'],
+        'progress': job['progress'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at']
+    })
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = render_jobs.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if job['status'] == 'failed':
+        return jsonify({'error': job['error'], 'status': job['status']}), 500
+    if job['status'] != 'completed':
+        return jsonify({'error': 'Video is not ready yet', 'status': job['status'], 'progress': job['progress']}), 409
+    
+    output_path = job['output_path']
+    return jsonify({
+        'success': True,
+        'video_path': output_path,
+        'download_url': f'/download/{os.path.basename(output_path)}'
+    })
+
 @app.route('/download/<filename>')
 def download_file(filename):
     try:
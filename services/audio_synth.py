@@ -0,0 +1,78 @@
+import numpy as np
+from config import AUDIO_SAMPLE_RATE, AUDIO_CHUNK_SECONDS
+
+
+def synthesize_recipe(recipe, t):
+    """
+    Evaluate a music recipe at time t (a scalar or an array of times).
+
+    A recipe is a chord of (frequency, gain) `voices` played at `tempo`
+    times their frequency, plus an optional low frequency `pulse` and an
+    `envelope` applied to the whole mix:
+      ('attack', rate, until, hold) -> exp(-t * rate) before `until`, then `hold`
+      ('swell', base, depth, rate)  -> base + depth * sin(t * rate)
+    """
+    t = np.asarray(t, dtype=np.float64)
+    tempo = recipe.get('tempo', 1.0)
+
+    wave = np.zeros_like(t)
+    for freq, gain in recipe['voices']:
+        wave = wave + np.sin(2 * np.pi * freq * tempo * t) * gain
+
+    pulse = recipe.get('pulse')
+    if pulse:
+        wave = wave + np.sin(2 * np.pi * pulse[0] * t) * pulse[1]
+
+    envelope = recipe.get('envelope')
+    if envelope:
+        kind, *params = envelope
+        if kind == 'attack':
+            rate, until, hold = params
+            wave = wave * np.where(t < until, np.exp(-t * rate), hold)
+        elif kind == 'swell':
+            base, depth, rate = params
+            wave = wave * (base + depth * np.sin(t * rate))
+
+    return wave
+
+
+def stereo(samples):
+    """
+    (samples, 2) float32 copy of mono (n,) / (n, 1) or stereo audio.
+
+    MoviePy 2's AudioArrayClip always returns two-channel frames, so a
+    one-channel array breaks fades and is written at twice its length.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    if samples.shape[1] == 2:
+        return samples
+    return np.repeat(samples[:, :1], 2, axis=1)
+
+
+class AudioSynthesizer:
+    def __init__(self, sample_rate=AUDIO_SAMPLE_RATE, chunk_seconds=AUDIO_CHUNK_SECONDS):
+        """
+        Renders recipe soundtracks as whole NumPy arrays.
+
+        The track is synthesised in fixed-size chunks of vectorised sample
+        times (bounding the float64 temporaries) into one float32 buffer.
+        Finished audio is cached as loopable stems by services.stem_cache.
+        """
+        self.sample_rate = sample_rate
+        self.chunk_samples = max(1, int(chunk_seconds * sample_rate))
+
+    def render(self, recipe, duration):
+        """Read-only (samples, 2) float32 stereo array of the recipe for duration seconds"""
+        total = max(1, int(round(duration * self.sample_rate)))
+        track = np.empty((total, 2), dtype=np.float32)
+        for start in range(0, total, self.chunk_samples):
+            end = min(start + self.chunk_samples, total)
+            t = np.arange(start, end, dtype=np.float64) / self.sample_rate
+            track[start:end] = synthesize_recipe(recipe, t)[:, None]
+        track.setflags(write=False)
+        return track
+
+
+audio_synthesizer = AudioSynthesizer()
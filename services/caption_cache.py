@@ -0,0 +1,59 @@
+import json
+import numpy as np
+from services.lru import SQLiteLRU
+from config import CAPTION_CACHE_PATH, CAPTION_CACHE_MAX_ENTRIES
+
+
+class CaptionCache:
+    def __init__(self, db_path=CAPTION_CACHE_PATH, max_entries=CAPTION_CACHE_MAX_ENTRIES):
+        """
+        Disk-backed LRU cache of per-photo model outputs.
+
+        Entries are keyed by the SHA-256 of the image bytes plus the model
+        name and version, so a re-uploaded photo skips inference while a
+        model upgrade naturally misses.
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.store = SQLiteLRU(
+            db_path, 'captions',
+            key_columns=('content_hash', 'model', 'model_version'),
+            value_columns=(('payload', 'TEXT NOT NULL'), ('embedding', 'BLOB')),
+            max_entries=max_entries
+        )
+
+    def get(self, content_hash, model, model_version):
+        """Return the cached entry dict (with 'embedding' if stored) or None"""
+        row = self.store.get((content_hash, model, model_version))
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        entry = json.loads(row[0])
+        if row[1] is not None:
+            entry['embedding'] = np.frombuffer(row[1], dtype=np.float32).copy()
+        return entry
+
+    def put(self, content_hash, model, model_version, entry):
+        """Store an entry; an 'embedding' array is kept as raw float32 bytes"""
+        entry = dict(entry)
+        embedding = entry.pop('embedding', None)
+        blob = np.asarray(embedding, dtype=np.float32).tobytes() if embedding is not None else None
+        self.store.put((content_hash, model, model_version), (json.dumps(entry), blob))
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current entry count"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': self.store.count(),
+            'max_entries': self.max_entries
+        }
+
+    def close(self):
+        self.store.close()
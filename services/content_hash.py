@@ -0,0 +1,50 @@
+import os
+import re
+import hashlib
+from functools import lru_cache
+from config import UPLOAD_FOLDER
+
+# Blob IDs are <sha256>.<ext>; anything else is rejected so IDs from clients
+# can never escape the blob folder
+BLOB_ID_PATTERN = re.compile(r'^[0-9a-f]{64}\.(?:jpg|png|gif|bmp)$')
+
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    """Hash a file's bytes in fixed-size chunks so large photos never sit in memory"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_blob_id(value):
+    return isinstance(value, str) and BLOB_ID_PATTERN.match(value) is not None
+
+
+def resolve_photo_path(photo, root=UPLOAD_FOLDER):
+    """
+    Map a blob ID to its file in the store.
+
+    Other values are local file paths from trusted in-process callers and
+    are returned unchanged; the HTTP API only ever accepts blob IDs.
+    """
+    if is_blob_id(photo):
+        return os.path.join(root, 'blobs', photo)
+    return photo
+
+
+def photo_content_hash(photo):
+    """SHA-256 of a photo's bytes, read from the blob ID instead of rehashing when possible"""
+    name = os.path.basename(photo)
+    if is_blob_id(name) and (name == photo or os.path.basename(os.path.dirname(photo)) == 'blobs'):
+        return os.path.splitext(name)[0]
+    path = resolve_photo_path(photo)
+    stat = os.stat(path)
+    return _cached_file_hash(os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=4096)
+def _cached_file_hash(path, mtime_ns, size):
+    """Hash of a local file, reused until its modification time or size changes"""
+    return sha256_file(path)
@@ -1,17 +1,31 @@
 import os
-from transformers import pipeline
 from PIL import Image
-import torch
+from services.caption_cache import CaptionCache
+from services.content_hash import resolve_photo_path, photo_content_hash
+from services.model_registry import model_registry, model_revision, cached_model_revision
+from config import INFERENCE_BATCH_SIZE
 
 class ContextGenerator:
     def __init__(self):
-        # Initialize BERT-based image captioning model
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.image_captioner = pipeline(
-            "image-to-text",
-            model="nlpconnect/vit-gpt2-image-captioning",
-            device=0 if self.device == "cuda" else -1
-        )
+        # The vit-gpt2 captioner is loaded by the shared model registry on
+        # first use (or by app warm-up), not when the service is created
+        self.model_name = "nlpconnect/vit-gpt2-image-captioning"
+        self._model_version = None
+        
+        # Captions keyed by image content, so repeat uploads skip the model
+        self.caption_cache = CaptionCache()
+        self.batch_size = INFERENCE_BATCH_SIZE
+    
+    @property
+    def image_captioner(self):
+        return model_registry.get('captioner')
+    
+    @property
+    def model_version(self):
+        """Checkpoint revision the captions are keyed on, read from the Hub cache so cache hits don't load the model"""
+        if self._model_version is None:
+            self._model_version = cached_model_revision(self.model_name) or model_revision(self.image_captioner.model)
+        return self._model_version
     
     def generate_context(self, photo_paths):
         """
@@ -19,22 +33,13 @@ class ContextGenerator:
         """
         try:
             # Generate individual captions for each photo
-            individual_captions = []
-            for photo_path in photo_paths:
-                try:
-                    image = Image.open(photo_path)
-                    # Fix the parameter issue
-                    caption = self.image_captioner(image)
-                    individual_captions.append({
-                        'photo': os.path.basename(photo_path),
-                        'caption': caption[0]['generated_text']
-                    })
-                except Exception as e:
-                    print(f"Error generating caption for {photo_path}: {str(e)}")
-                    individual_captions.append({
-                        'photo': os.path.basename(photo_path),
-                        'caption': 'Unable to generate caption'
-                    })
+            captions = self._caption_photos(photo_paths)
+            individual_captions = [
+                {'photo': os.path.basename(photo_path), 'caption': caption}
+                for photo_path, caption in zip(photo_paths, captions)
+            ]
+            
+            print(f"Caption cache: {self.caption_cache.stats()}")
             
             # Generate overall context
             overall_context = self._generate_overall_context(individual_captions)
@@ -53,6 +58,50 @@ class ContextGenerator:
                 'photo_count': len(photo_paths)
             }
     
+    def _caption_photos(self, photo_paths):
+        """
+        Caption photos in input order, running the captioner in batches over cache misses only
+        """
+        captions = ['Unable to generate caption'] * len(photo_paths)
+        misses = []
+        for index, photo_path in enumerate(photo_paths):
+            try:
+                content_hash = photo_content_hash(photo_path)
+                cached = self.caption_cache.get(content_hash, self.model_name, self.model_version)
+                if cached:
+                    captions[index] = cached['caption']
+                else:
+                    misses.append((index, content_hash))
+            except Exception as e:
+                print(f"Error generating caption for {photo_path}: {str(e)}")
+        
+        for start in range(0, len(misses), self.batch_size):
+            batch = []
+            images = []
+            for index, content_hash in misses[start:start + self.batch_size]:
+                try:
+                    images.append(Image.open(resolve_photo_path(photo_paths[index])).convert('RGB'))
+                    batch.append((index, content_hash))
+                except Exception as e:
+                    print(f"Error generating caption for {photo_paths[index]}: {str(e)}")
+            if not images:
+                continue
+            
+            try:
+                import torch
+                with torch.inference_mode():
+                    outputs = self.image_captioner(images, batch_size=self.batch_size)
+            except Exception as e:
+                print(f"Error generating captions for batch starting at photo {batch[0][0] + 1}: {str(e)}")
+                continue
+            
+            for (index, content_hash), output in zip(batch, outputs):
+                caption = output[0]['generated_text']
+                captions[index] = caption
+                self.caption_cache.put(content_hash, self.model_name, self.model_version, {'caption': caption})
+        
+        return captions
+    
     def _generate_overall_context(self, individual_captions):
         """
         Generate overall context from individual captions
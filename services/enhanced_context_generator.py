@@ -4,26 +4,18 @@ Enhanced context generator with CLIP embeddings and better captioning
 """
 
 import os
-import numpy as np
-from PIL import Image
-import torch
-from transformers import CLIPProcessor, CLIPModel, BlipProcessor, BlipForConditionalGeneration
 import spacy
 from typing import List, Dict, Any
+from services.photo_analysis import PhotoAnalysisMixin
 import json
 
-class EnhancedContextGenerator:
+class EnhancedContextGenerator(PhotoAnalysisMixin):
     def __init__(self):
         """Initialize enhanced context generator with CLIP and BLIP models"""
         print("Loading enhanced context generation models...")
         
-        # Load CLIP for semantic embeddings
-        self.clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-        self.clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-        
-        # Load BLIP for better image captioning
-        self.blip_processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-        self.blip_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
+        # Shared BLIP/CLIP models, caption cache and scene templates
+        self._init_photo_analysis()
         
         # Load spaCy for NER
         try:
@@ -32,18 +24,6 @@ class EnhancedContextGenerator:
             print("spaCy model not found. Install with: python -m spacy download en_core_web_sm")
             self.nlp = None
         
-        # Scene classification templates
-        self.scene_templates = [
-            "a family gathering with people",
-            "a romantic couple moment",
-            "a travel adventure scene",
-            "a party celebration event",
-            "a nature landscape view",
-            "a dramatic important moment",
-            "a peaceful calm scene",
-            "a business professional setting"
-        ]
-        
         print("Enhanced context generation models loaded successfully!")
 
     def generate_context(self, photo_paths: List[str]) -> Dict[str, Any]:
@@ -56,21 +36,10 @@ class EnhancedContextGenerator:
             scene_classifications = []
             entities = []
             
-            for i, photo_path in enumerate(photo_paths):
-                print(f"Processing photo {i+1}/{len(photo_paths)}: {os.path.basename(photo_path)}")
-                
-                # Load and process image
-                image = Image.open(photo_path).convert('RGB')
-                
-                # Generate BLIP caption
-                caption = self._generate_blip_caption(image)
-                
-                # Generate CLIP embedding
-                embedding = self._generate_clip_embedding(image)
-                
-                # Classify scene
-                scene = self._classify_scene(image, embedding)
-                
+            # Caption, embed and classify all photos (batched, cache misses only)
+            analyses = self._analyze_photos(photo_paths)
+            
+            for photo_path, (caption, embedding, scene) in zip(photo_paths, analyses):
                 # Extract entities from caption
                 photo_entities = self._extract_entities(caption)
                 
@@ -85,6 +54,8 @@ class EnhancedContextGenerator:
                 scene_classifications.append(scene)
                 entities.extend(photo_entities)
             
+            print(f"Caption cache: {self.caption_cache.stats()}")
+            
             # Generate overall context
             overall_context = self._generate_overall_context(individual_captions, scene_classifications, entities)
             
@@ -113,53 +84,6 @@ class EnhancedContextGenerator:
                 'themes': []
             }
 
-    def _generate_blip_caption(self, image: Image.Image) -> str:
-        """Generate caption using BLIP model"""
-        try:
-            inputs = self.blip_processor(image, return_tensors="pt")
-            out = self.blip_model.generate(**inputs, max_length=50, num_beams=5)
-            caption = self.blip_processor.decode(out[0], skip_special_tokens=True)
-            return caption
-        except Exception as e:
-            print(f"Error generating BLIP caption: {str(e)}")
-            return "A photo"
-
-    def _generate_clip_embedding(self, image: Image.Image) -> np.ndarray:
-        """Generate CLIP embedding for semantic similarity"""
-        try:
-            inputs = self.clip_processor(images=image, return_tensors="pt")
-            with torch.no_grad():
-                image_features = self.clip_model.get_image_features(**inputs)
-                # Normalize embeddings
-                image_features = image_features / image_features.norm(dim=-1, keepdim=True)
-                return image_features.numpy().flatten()
-        except Exception as e:
-            print(f"Error generating CLIP embedding: {str(e)}")
-            return np.zeros(512)  # Default embedding size
-
-    def _classify_scene(self, image: Image.Image, embedding: np.ndarray) -> str:
-        """Classify scene using CLIP similarity with templates"""
-        try:
-            # Get text embeddings for scene templates
-            text_inputs = self.clip_processor(text=self.scene_templates, return_tensors="pt", padding=True)
-            with torch.no_grad():
-                text_features = self.clip_model.get_text_features(**text_inputs)
-                text_features = text_features / text_features.norm(dim=-1, keepdim=True)
-            
-            # Calculate similarities
-            similarities = torch.cosine_similarity(
-                torch.tensor(embedding).unsqueeze(0), 
-                text_features
-            )
-            
-            # Get best matching scene
-            best_match_idx = similarities.argmax().item()
-            return self.scene_templates[best_match_idx]
-            
-        except Exception as e:
-            print(f"Error classifying scene: {str(e)}")
-            return "a general photo scene"
-
     def _extract_entities(self, text: str) -> List[str]:
         """Extract named entities using spaCy"""
         if not self.nlp:
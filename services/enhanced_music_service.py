@@ -4,13 +4,46 @@ Enhanced music service with MusicGen and external audio APIs
 """
 
 import os
-import numpy as np
-import torch
-from moviepy.editor import AudioClip
-from typing import Dict, Any, Optional
+from moviepy import AudioClip
+from moviepy.audio.AudioClip import AudioArrayClip
+from typing import Dict, Any, Optional, List
 import requests
 import json
 from datetime import datetime
+from services.audio_synth import stereo
+from services.stem_cache import stem_cache
+from services.musicgen_worker import musicgen_worker
+
+# Fallback synthesis per style (see services.audio_synth.synthesize_recipe)
+SYNTHETIC_MUSIC_RECIPES = {
+    'nostalgic': {
+        'voices': [(220, 0.3), (277, 0.25), (330, 0.2), (392, 0.15)],  # A3 C#4 E4 G4 - warm chord
+        'pulse': (0.5, 0.1),  # Reverb-like swell
+        'envelope': ('attack', 0.1, 3, 0.7)
+    },
+    'upbeat': {
+        'voices': [(440, 0.3), (554, 0.25), (659, 0.2), (784, 0.15)],  # A4 C#5 E5 G5 - bright tones
+        'tempo': 1.5,
+        'pulse': (4, 0.1)  # Rhythm
+    },
+    'romantic': {
+        'voices': [(392, 0.3), (494, 0.25), (587, 0.2), (659, 0.15)],  # G4 B4 D5 E5 - soft tones
+        'envelope': ('attack', 0.2, 2, 0.6)
+    },
+    'energetic': {
+        'voices': [(523, 0.3), (659, 0.25), (784, 0.2), (880, 0.15)],  # C5 E5 G5 A5 - dynamic tones
+        'tempo': 2.0,
+        'pulse': (6, 0.1)  # Percussion
+    },
+    'dramatic': {
+        'voices': [(220, 0.4), (277, 0.3), (330, 0.2), (392, 0.15)],  # A3 C#4 E4 G4 - intense tones
+        'envelope': ('swell', 0.5, 0.3, 0.5)  # Variable intensity
+    },
+    'calm': {
+        'voices': [(220, 0.2), (277, 0.15), (330, 0.1), (392, 0.05)],  # A3 C#4 E4 G4 - peaceful tones
+        'tempo': 0.5
+    }
+}
 
 class EnhancedMusicService:
     def __init__(self, use_musicgen: bool = True, use_external_api: bool = False):
@@ -18,20 +51,8 @@ class EnhancedMusicService:
         self.use_musicgen = use_musicgen
         self.use_external_api = use_external_api
         
-        # MusicGen model (if available)
-        self.musicgen_model = None
-        self.musicgen_processor = None
-        
-        if use_musicgen:
-            try:
-                from transformers import MusicgenForConditionalGeneration, AutoProcessor
-                print("Loading MusicGen model...")
-                self.musicgen_model = MusicgenForConditionalGeneration.from_pretrained("facebook/musicgen-small")
-                self.musicgen_processor = AutoProcessor.from_pretrained("facebook/musicgen-small")
-                print("MusicGen model loaded successfully!")
-            except Exception as e:
-                print(f"Could not load MusicGen: {str(e)}")
-                self.use_musicgen = False
+        # MusicGen runs on a background worker (model loaded there on first use)
+        self.musicgen_worker = musicgen_worker
         
         # External API configuration
         self.external_api_key = os.getenv("AUDIO_API_KEY")
@@ -86,7 +107,7 @@ class EnhancedMusicService:
     def get_background_music(self, style: str, duration: float, context: str = "") -> AudioClip:
         """Generate or retrieve background music"""
         try:
-            if self.use_musicgen and self.musicgen_model:
+            if self.use_musicgen:
                 return self._generate_musicgen_audio(style, duration, context)
             elif self.use_external_api and self.external_api_key:
                 return self._fetch_external_audio(style, duration, context)
@@ -97,7 +118,7 @@ class EnhancedMusicService:
             return self._generate_synthetic_audio(style, duration)
 
     def _generate_musicgen_audio(self, style: str, duration: float, context: str) -> AudioClip:
-        """Generate audio using MusicGen model"""
+        """Serve a MusicGen track generated in the background, or synthetic audio until it is ready"""
         try:
             style_config = self.music_styles.get(style, self.music_styles['calm'])
             
@@ -106,39 +127,15 @@ class EnhancedMusicService:
             if context:
                 prompt += f", {context}"
             
-            # Generate audio
-            inputs = self.musicgen_processor(
-                text=[prompt],
-                padding=True,
-                return_tensors="pt"
-            )
-            
-            with torch.no_grad():
-                audio_values = self.musicgen_model.generate(
-                    **inputs,
-                    max_new_tokens=int(duration * 50),  # Approximate tokens for duration
-                    do_sample=True,
-                    guidance_scale=3.0
-                )
-            
-            # Convert to numpy array
-            audio_array = audio_values[0].cpu().numpy()
-            
-            # Create AudioClip
-            def make_frame(t):
-                if isinstance(t, np.ndarray):
-                    t = t[0] if len(t) > 0 else 0
-                
-                # Ensure t is within bounds
-                t = max(0, min(t, duration))
-                sample_idx = int(t * 22050)  # 22050 Hz sample rate
-                
-                if sample_idx < len(audio_array):
-                    return audio_array[sample_idx]
-                else:
-                    return 0
+            # Never wait for the model: a miss queues generation for the next render
+            track = self.musicgen_worker.get(style, prompt, duration, context)
+            if track is None:
+                print(f"MusicGen {style} track not ready yet, using synthetic music")
+                return self._generate_synthetic_audio(style, duration)
             
-            return AudioClip(make_frame, duration=duration, fps=22050)
+            audio, sampling_rate = track
+            samples = min(len(audio), int(duration * sampling_rate))
+            return AudioArrayClip(stereo(audio[:samples]), fps=sampling_rate)
             
         except Exception as e:
             print(f"Error with MusicGen: {str(e)}")
@@ -191,123 +188,8 @@ class EnhancedMusicService:
 
     def _generate_synthetic_audio(self, style: str, duration: float) -> AudioClip:
         """Generate synthetic audio as fallback"""
-        style_config = self.music_styles.get(style, self.music_styles['calm'])
-        
-        def make_frame(t):
-            # Handle both single values and arrays
-            if hasattr(t, '__len__') and len(t) > 1:
-                t = t[0] if len(t) > 0 else 0
-            
-            # Generate enhanced synthetic audio based on style
-            if style == 'nostalgic':
-                # Nostalgic melody with warm tones
-                freq1 = 220  # A3 - warm base
-                freq2 = 277  # C#4 - emotional
-                freq3 = 330  # E4 - nostalgic
-                freq4 = 392  # G4 - warm harmony
-                
-                # Create chord progression with envelope
-                envelope = np.exp(-t * 0.1) if t < 3 else 0.7
-                
-                wave1 = np.sin(2 * np.pi * freq1 * t) * 0.3 * envelope
-                wave2 = np.sin(2 * np.pi * freq2 * t) * 0.25 * envelope
-                wave3 = np.sin(2 * np.pi * freq3 * t) * 0.2 * envelope
-                wave4 = np.sin(2 * np.pi * freq4 * t) * 0.15 * envelope
-                
-                # Add some reverb-like effect
-                reverb = np.sin(2 * np.pi * 0.5 * t) * 0.1 * envelope
-                
-                return wave1 + wave2 + wave3 + wave4 + reverb
-                
-            elif style == 'upbeat':
-                # Enhanced upbeat melody with bright tones
-                freq1 = 440  # A4 - bright
-                freq2 = 554  # C#5 - energetic
-                freq3 = 659  # E5 - celebratory
-                freq4 = 784  # G5 - exciting
-                
-                # Fast tempo with rhythm
-                tempo = 1.5
-                wave1 = np.sin(2 * np.pi * freq1 * t * tempo) * 0.3
-                wave2 = np.sin(2 * np.pi * freq2 * t * tempo) * 0.25
-                wave3 = np.sin(2 * np.pi * freq3 * t * tempo) * 0.2
-                wave4 = np.sin(2 * np.pi * freq4 * t * tempo) * 0.15
-                
-                # Add rhythm
-                rhythm = np.sin(2 * np.pi * 4 * t) * 0.1
-                
-                return wave1 + wave2 + wave3 + wave4 + rhythm
-                
-            elif style == 'romantic':
-                # Enhanced romantic melody with soft tones
-                freq1 = 392  # G4 - romantic
-                freq2 = 494  # B4 - intimate
-                freq3 = 587  # D5 - loving
-                freq4 = 659  # E5 - tender
-                
-                # Soft attack with envelope
-                envelope = np.exp(-t * 0.2) if t < 2 else 0.6
-                
-                wave1 = np.sin(2 * np.pi * freq1 * t) * 0.3 * envelope
-                wave2 = np.sin(2 * np.pi * freq2 * t) * 0.25 * envelope
-                wave3 = np.sin(2 * np.pi * freq3 * t) * 0.2 * envelope
-                wave4 = np.sin(2 * np.pi * freq4 * t) * 0.15 * envelope
-                
-                return wave1 + wave2 + wave3 + wave4
-                
-            elif style == 'energetic':
-                # Enhanced energetic melody with dynamic tones
-                freq1 = 523  # C5 - energetic
-                freq2 = 659  # E5 - exciting
-                freq3 = 784  # G5 - dynamic
-                freq4 = 880  # A5 - powerful
-                
-                # Very fast tempo
-                tempo = 2.0
-                wave1 = np.sin(2 * np.pi * freq1 * t * tempo) * 0.3
-                wave2 = np.sin(2 * np.pi * freq2 * t * tempo) * 0.25
-                wave3 = np.sin(2 * np.pi * freq3 * t * tempo) * 0.2
-                wave4 = np.sin(2 * np.pi * freq4 * t * tempo) * 0.15
-                
-                # Add percussion
-                percussion = np.sin(2 * np.pi * 6 * t) * 0.1
-                
-                return wave1 + wave2 + wave3 + wave4 + percussion
-                
-            elif style == 'dramatic':
-                # Enhanced dramatic melody with intense tones
-                freq1 = 220  # A3 - dramatic base
-                freq2 = 277  # C#4 - intense
-                freq3 = 330  # E4 - powerful
-                freq4 = 392  # G4 - dramatic
-                
-                # Variable intensity
-                intensity = 0.5 + 0.3 * np.sin(t * 0.5)
-                
-                wave1 = np.sin(2 * np.pi * freq1 * t) * 0.4 * intensity
-                wave2 = np.sin(2 * np.pi * freq2 * t) * 0.3 * intensity
-                wave3 = np.sin(2 * np.pi * freq3 * t) * 0.2 * intensity
-                wave4 = np.sin(2 * np.pi * freq4 * t) * 0.15 * intensity
-                
-                return wave1 + wave2 + wave3 + wave4
-                
-            else:  # calm
-                # Enhanced calm melody with peaceful tones
-                freq1 = 220  # A3 - peaceful
-                freq2 = 277  # C#4 - serene
-                freq3 = 330  # E4 - calm
-                freq4 = 392  # G4 - relaxing
-                
-                # Very slow tempo
-                tempo = 0.5
-                wave1 = np.sin(2 * np.pi * freq1 * t * tempo) * 0.2
-                wave2 = np.sin(2 * np.pi * freq2 * t * tempo) * 0.15
-                wave3 = np.sin(2 * np.pi * freq3 * t * tempo) * 0.1
-                wave4 = np.sin(2 * np.pi * freq4 * t * tempo) * 0.05
-                
-                return wave1 + wave2 + wave3 + wave4
-        
-        return AudioClip(make_frame, duration=duration, fps=44100)
+        recipe = SYNTHETIC_MUSIC_RECIPES.get(style, SYNTHETIC_MUSIC_RECIPES['calm'])
+        return stem_cache.clip(recipe, duration)
 
     def get_music_info(self, style: str) -> Dict[str, Any]:
         """Get information about a music style"""
@@ -0,0 +1,275 @@
+import os
+import math
+import uuid
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import cv2
+import numpy as np
+from moviepy.config import FFMPEG_BINARY
+from services.motion_engine import MotionEngine
+from services.process_pool import worker_context
+from config import DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT, AUDIO_SAMPLE_RATE
+
+
+def render_segment(options, shots, first_frame, last_frame, output_path):
+    """
+    Encode frames [first_frame, last_frame) of a slideshow to output_path.
+
+    Top-level so it can run in a worker process; shots keep their global
+    start times, so transitions crossing the segment boundary render
+    exactly as they would in one stream. Returns output_path.
+    """
+    renderer = FFmpegSlideshowRenderer(**options)
+    renderer._encode([renderer._prepare_shot(shot) for shot in shots], first_frame, last_frame, output_path)
+    return output_path
+
+
+class FFmpegSlideshowRenderer:
+    def __init__(self, size=(DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT), fps=30, bitrate=None, codec='libx264',
+                 preset='medium', segment_workers=1, motion_engine=None):
+        """
+        Slideshow renderer that skips MoviePy's generic compositing.
+
+        A render is a list of shots, each a dict with:
+          frame       (height, width, 3) uint8 photo frame
+          start       seconds into the video
+          duration    seconds on screen
+          motion      MotionEngine.motion_rects spec, e.g. ('zoom', 1.0, 1.2, (0.5, 0.5), (0.5, 0.5))
+          transition  None, ('fade', fade_in, fade_out) or ('slide', pixels_per_second, fade)
+          crossfade   seconds the shot blends in over the one before it (see Timeline)
+
+        Every output frame is computed with NumPy/OpenCV into preallocated
+        buffers and written as raw RGB to an ffmpeg subprocess. Only frames
+        inside a crossfade window render and blend two shots.
+
+        With segment_workers > 1 the video is cut at photo boundaries, each
+        segment is encoded by a worker process with identical codec
+        settings, and the segments are joined losslessly with ffmpeg's
+        concat demuxer.
+        """
+        self.size = size
+        self.fps = fps
+        self.bitrate = bitrate
+        self.codec = codec
+        self.preset = preset
+        self.segment_workers = max(1, segment_workers)
+        self.motion_engine = motion_engine or MotionEngine()
+
+        width, height = size
+        self.output = np.zeros((height, width, 3), dtype=np.uint8)
+        self.black = np.zeros_like(self.output)
+        self.layers = [np.zeros_like(self.output), np.zeros_like(self.output)]
+        self.matrix = np.zeros((2, 3), dtype=np.float64)
+
+    def render(self, shots, output_path, audio=None, progress_callback=None):
+        """
+        Encode the shots to output_path, muxing in audio (an AudioClip) if given
+
+        progress_callback(fraction) is called about once per second of video,
+        or once per segment when rendering in parallel.
+        """
+        duration = max((shot['start'] + shot['duration'] for shot in shots), default=0)
+        total_frames = int(round(duration * self.fps))
+        if total_frames == 0:
+            raise ValueError("Nothing to render")
+
+        audio_path = None
+        if audio is not None:
+            audio_path = os.path.join(os.path.dirname(output_path) or '.', f"temp-audio-{uuid.uuid4().hex[:8]}.wav")
+            audio.write_audiofile(audio_path, fps=AUDIO_SAMPLE_RATE, codec='pcm_s16le', logger=None)
+
+        try:
+            if self.segment_workers > 1 and len(shots) > 1:
+                self._render_segments(shots, total_frames, output_path, audio_path, progress_callback)
+            else:
+                prepared = [self._prepare_shot(shot) for shot in shots]
+                self._encode(prepared, 0, total_frames, output_path, audio_path, progress_callback)
+        finally:
+            if audio_path and os.path.exists(audio_path):
+                os.remove(audio_path)
+
+        if progress_callback:
+            progress_callback(1.0)
+        print(f"Piped {total_frames} frames ({duration:.2f}s at {self.fps} fps) to ffmpeg: {output_path}")
+        return output_path
+
+    def segment_bounds(self, shots, total_frames):
+        """Frame ranges [first, last) split where each photo after the first comes on screen"""
+        cuts = sorted({min(total_frames, math.ceil(shot['start'] * self.fps - 1e-6)) for shot in shots} | {0, total_frames})
+        return [(first, last) for first, last in zip(cuts, cuts[1:]) if last > first]
+
+    def _render_segments(self, shots, total_frames, output_path, audio_path=None, progress_callback=None):
+        """Encode photo-boundary segments on a process pool, then concatenate them without re-encoding"""
+        bounds = self.segment_bounds(shots, total_frames)
+        segment_folder = os.path.join(os.path.dirname(output_path) or '.', f"segments-{uuid.uuid4().hex[:8]}")
+        os.makedirs(segment_folder, exist_ok=True)
+        options = {
+            'size': self.size,
+            'fps': self.fps,
+            'bitrate': self.bitrate,
+            'codec': self.codec,
+            'preset': self.preset
+        }
+
+        jobs = []
+        for index, (first, last) in enumerate(bounds):
+            # Only ship the shots on screen during this segment
+            start, end = first / self.fps, last / self.fps
+            segment_shots = [shot for shot in shots if shot['start'] < end and shot['start'] + shot['duration'] > start]
+            jobs.append((options, segment_shots, first, last, os.path.join(segment_folder, f"segment_{index:04d}.mp4")))
+
+        try:
+            try:
+                with ProcessPoolExecutor(max_workers=min(self.segment_workers, len(jobs)), mp_context=worker_context()) as executor:
+                    futures = [executor.submit(render_segment, *job) for job in jobs]
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        future.result()
+                        if progress_callback:
+                            progress_callback(0.95 * done / len(jobs))
+            except BrokenProcessPool as e:
+                print(f"Segment pool failed, encoding segments in-process: {str(e)}")
+                for job in jobs:
+                    render_segment(*job)
+
+            list_path = os.path.join(segment_folder, 'segments.txt')
+            with open(list_path, 'w') as f:
+                for job in jobs:
+                    f.write(f"file '{os.path.abspath(job[-1])}'\n")
+
+            # Segments share codec settings, so the video stream is copied as is
+            command = [FFMPEG_BINARY, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', list_path]
+            if audio_path:
+                command += ['-i', audio_path]
+            command += ['-c:v', 'copy']
+            if audio_path:
+                command += ['-c:a', 'aac', '-shortest']
+            command.append(output_path)
+            self._run(command)
+            print(f"Joined {len(jobs)} segments encoded by {min(self.segment_workers, len(jobs))} workers")
+        finally:
+            shutil.rmtree(segment_folder, ignore_errors=True)
+
+    def _encode(self, shots, first_frame, last_frame, output_path, audio_path=None, progress_callback=None):
+        """Pipe frames [first_frame, last_frame) of prepared shots through one ffmpeg process"""
+        process = subprocess.Popen(
+            self._command(output_path, audio_path),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        total_frames = last_frame - first_frame
+        try:
+            for index in range(first_frame, last_frame):
+                process.stdin.write(self.compose(shots, index / self.fps))
+                done = index + 1 - first_frame
+                if progress_callback and done % self.fps == 0:
+                    progress_callback(done / total_frames)
+            process.stdin.close()
+        except BrokenPipeError:
+            # ffmpeg exited early; its stderr says why
+            pass
+        finally:
+            error = process.stderr.read().decode(errors='replace')
+            process.wait()
+
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with code {process.returncode}: {error.strip()}")
+
+    def _run(self, command):
+        """Run a one-shot ffmpeg command, raising with its stderr on failure"""
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with code {result.returncode}: {result.stderr.decode(errors='replace').strip()}")
+
+    def compose(self, shots, t):
+        """Return the output frame at time t; the array is reused by the next call"""
+        active = [shot for shot in shots if shot['start'] <= t < shot['start'] + shot['duration']]
+        if not active:
+            return self.black
+
+        frame = self._shot_frame(active[0], t, self.layers[0])
+        for shot in active[1:]:
+            top = self._shot_frame(shot, t, self.layers[1])
+            crossfade = shot.get('crossfade')
+            alpha = min((t - shot['start']) / crossfade, 1.0) if crossfade else 1.0
+            cv2.addWeighted(top, alpha, frame, 1.0 - alpha, 0, dst=self.output)
+            frame = self.output
+        return frame
+
+    def _prepare_shot(self, shot):
+        """Resolve a shot's motion into start and end crop rectangles once"""
+        source = self.motion_engine.prepare_source(shot['frame'])
+        src_h, src_w = source.shape[:2]
+        start_rect, end_rect = self.motion_engine.motion_rects(src_w, src_h, shot.get('motion') or ('static',))
+        start = np.asarray(start_rect, dtype=np.float64)
+        end = np.asarray(end_rect, dtype=np.float64)
+
+        # A still, full-size frame can be written as is
+        still = np.array_equal(start, end) and (src_w, src_h) == tuple(self.size) and np.array_equal(start, [0, 0, src_w, src_h])
+        return dict(shot, source=source, rect=start, delta=end - start, still=still)
+
+    def _shot_frame(self, shot, t, layer):
+        """Render one shot at time t, using layer as scratch space when the frame changes"""
+        local_t = t - shot['start']
+        if shot['still']:
+            image = shot['source']
+        else:
+            progress = min(max(local_t / shot['duration'], 0.0), 1.0)
+            image = self.motion_engine.warp(shot['source'], shot['rect'] + shot['delta'] * progress, layer, self.matrix)
+
+        transition = shot.get('transition')
+        if not transition:
+            return image
+
+        kind = transition[0]
+        if kind == 'slide':
+            _, speed, fade = transition
+            fade_in = fade_out = fade
+            offset = int(round(local_t * speed))
+            if offset:
+                image = self._shift(image, offset, layer)
+        else:
+            _, fade_in, fade_out = transition
+
+        # Fades run to black: scale the frame by the fade envelope
+        alpha = 1.0
+        if fade_in and local_t < fade_in:
+            alpha = min(alpha, local_t / fade_in)
+        if fade_out and shot['duration'] - local_t < fade_out:
+            alpha = min(alpha, (shot['duration'] - local_t) / fade_out)
+        if alpha < 1.0:
+            cv2.convertScaleAbs(image, dst=layer, alpha=alpha)
+            image = layer
+        return image
+
+    def _shift(self, image, offset, layer):
+        """Move the frame offset pixels right (negative for left) over black"""
+        width = image.shape[1]
+        offset = max(-width, min(width, offset))
+        if offset > 0:
+            layer[:, offset:] = image[:, :width - offset]
+            layer[:, :offset] = 0
+        else:
+            layer[:, :width + offset] = image[:, -offset:]
+            layer[:, width + offset:] = 0
+        return layer
+
+    def _command(self, output_path, audio_path=None):
+        width, height = self.size
+        command = [
+            FFMPEG_BINARY, '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-vcodec', 'rawvideo',
+            '-s', f"{width}x{height}", '-pix_fmt', 'rgb24', '-r', str(self.fps),
+            '-i', '-'
+        ]
+        if audio_path:
+            command += ['-i', audio_path]
+        command += ['-vcodec', self.codec, '-preset', self.preset, '-pix_fmt', 'yuv420p']
+        if self.bitrate:
+            command += ['-b:v', self.bitrate]
+        if audio_path:
+            command += ['-acodec', 'aac', '-shortest']
+        command.append(output_path)
+        return command
@@ -0,0 +1,118 @@
+import os
+import threading
+import numpy as np
+from services.lru import LRUCache
+from services.photo_decoder import PhotoDecoder
+from services.preprocess import normalized_frame_path, normalize_frame, save_frame
+from config import FRAME_CACHE_FOLDER, FRAME_CACHE_MEMORY_BYTES, FRAME_CACHE_DISK_BYTES, WORKING_COPY_FOLDER, DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT
+
+
+class FrameCache:
+    def __init__(self, cache_folder=FRAME_CACHE_FOLDER, max_memory_bytes=FRAME_CACHE_MEMORY_BYTES, max_disk_bytes=FRAME_CACHE_DISK_BYTES,
+                 working_folder=WORKING_COPY_FOLDER):
+        """
+        Two-tier cache of normalized (fitted and letterboxed) RGB frames.
+
+        Frames are keyed by content hash and resolution. The memory tier is an
+        LRU bounded by bytes; the disk tier stores raw .npy files that are
+        memory-mapped read-only on load, so re-renders and other generators
+        share pages through the OS cache instead of decoding again. The
+        preprocessing pool (services.preprocess) writes the same files.
+        """
+        self.cache_folder = cache_folder
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.decoder = PhotoDecoder(working_folder)
+        self.frames = LRUCache(max_memory_bytes, size_of=lambda frame: frame.nbytes)
+        self.hits = {'memory': 0, 'disk': 0}
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(cache_folder, exist_ok=True)
+
+    def get_frame(self, photo, size=(DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT), remember=True):
+        """
+        Return the read-only (height, width, 3) uint8 frame for a photo (blob ID or path).
+
+        With remember=False the frame is not added to the memory tier, and a
+        freshly decoded frame is returned as a map of its .npy file, so the
+        caller's resident memory is bounded by the page cache.
+        """
+        path = normalized_frame_path(self.cache_folder, photo, size)
+        key = os.path.basename(path)
+        frame = self.frames.get(key)
+        if frame is not None:
+            with self.lock:
+                self.hits['memory'] += 1
+            return frame
+
+        if os.path.exists(path):
+            try:
+                frame = np.load(path, mmap_mode='r')
+                os.utime(path)  # keep recently used frames through disk pruning
+                with self.lock:
+                    self.hits['disk'] += 1
+                if remember:
+                    self._remember(key, frame)
+                return frame
+            except Exception as e:
+                print(f"Error loading cached frame {path}, rebuilding: {str(e)}")
+
+        with self.lock:
+            self.misses += 1
+        frame = normalize_frame(photo, size, self.decoder)
+        frame.setflags(write=False)
+        written = self._write(path, frame)
+        if not remember:
+            return np.load(path, mmap_mode='r') if written else frame
+        self._remember(key, frame)
+        return frame
+
+    def stats(self):
+        with self.lock:
+            return {
+                'memory_hits': self.hits['memory'],
+                'disk_hits': self.hits['disk'],
+                'misses': self.misses,
+                'memory_frames': len(self.frames),
+                'memory_bytes': self.frames.size
+            }
+
+    def _remember(self, key, frame):
+        """Add to the memory LRU, evicting the least recently used frames over budget"""
+        if key not in self.frames:
+            self.frames.put(key, frame)
+
+    def _write(self, path, frame):
+        """Save a frame atomically, then keep the disk tier under its budget; True if the file is there"""
+        try:
+            save_frame(path, frame)
+            self.prune_disk()
+            return os.path.exists(path)
+        except Exception as e:
+            print(f"Error caching frame {path}: {str(e)}")
+            return False
+
+    def prune_disk(self):
+        """Delete the least recently used .npy files once the folder exceeds max_disk_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_folder):
+            if name.endswith('.npy'):
+                try:
+                    stat = os.stat(os.path.join(self.cache_folder, name))
+                    entries.append((stat.st_mtime, stat.st_size, name))
+                except OSError:
+                    continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                # Safe on POSIX even while another render has it memory-mapped
+                os.remove(os.path.join(self.cache_folder, name))
+                total -= size
+            except OSError:
+                continue
+
+
+frame_cache = FrameCache()
@@ -0,0 +1,122 @@
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, max_size, size_of=None):
+        """
+        Thread-safe in-memory LRU.
+
+        Entries are weighed with size_of(value) (1 each by default) and the
+        least recently used are evicted once the total exceeds max_size,
+        always keeping the newest entry.
+        """
+        self.max_size = max_size
+        self.size_of = size_of or (lambda value: 1)
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value and mark it most recently used, or None"""
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Store value under key, evicting least recently used entries over max_size"""
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= self.size_of(previous)
+            self.entries[key] = value
+            self.size += self.size_of(value)
+            while self.size > self.max_size and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= self.size_of(evicted)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+
+class SQLiteLRU:
+    def __init__(self, db_path, table, key_columns, value_columns, max_entries):
+        """
+        SQLite table used as a persistent LRU, shared between processes.
+
+        Rows are (key columns, value columns, last_access); reads refresh
+        last_access and writes drop the least recently used rows beyond
+        max_entries. Keys and values are tuples in column order.
+        """
+        self.table = table
+        self.key_columns = key_columns
+        self.value_columns = value_columns
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.key_match = " AND ".join(f"{column} = ?" for column in key_columns)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {", ".join(f"{column} TEXT NOT NULL" for column in key_columns)},
+                {", ".join(f"{column} {kind}" for column, kind in value_columns)},
+                last_access REAL NOT NULL,
+                PRIMARY KEY ({", ".join(key_columns)})
+            )
+        """)
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table} (last_access)")
+        self.conn.commit()
+
+    def get(self, key):
+        """Return the value tuple for key and refresh its last access, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(column for column, _ in self.value_columns)} FROM {self.table} WHERE {self.key_match}", key
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE {self.key_match}", (time.time(), *key))
+                self.conn.commit()
+            return row
+
+    def put(self, key, value):
+        """Insert or replace the row for key, then evict beyond max_entries"""
+        columns = list(self.key_columns) + [column for column, _ in self.value_columns] + ['last_access']
+        with self.lock:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                (*key, *value, time.time())
+            )
+            self._evict()
+            self.conn.commit()
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _evict(self):
+        """Drop least recently used rows beyond max_entries (caller holds the lock)"""
+        excess = self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN (SELECT rowid FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
@@ -0,0 +1,191 @@
+import os
+import time
+import threading
+import traceback
+
+
+class ModelRegistry:
+    def __init__(self):
+        """
+        Process-wide registry of heavy ML models.
+
+        Each model is described by a loader function and loaded at most once,
+        either on first get() or by a background warm-up thread. Every service
+        asking for the same name shares the same weights.
+        """
+        self.loaders = {}
+        self.models = {}
+        self.info = {}
+        self.lock = threading.Lock()
+        self.load_locks = {}
+
+    def register(self, name, loader):
+        """Register a zero-argument loader; nothing is loaded until the model is needed"""
+        with self.lock:
+            self.loaders[name] = loader
+            self.load_locks.setdefault(name, threading.Lock())
+            self.info.setdefault(name, {
+                'state': 'registered',
+                'load_seconds': None,
+                'parameter_bytes': None,
+                'rss_delta_bytes': None,
+                'error': None
+            })
+
+    def get(self, name):
+        """Return the loaded model, loading it in this thread if nobody has yet"""
+        if name in self.models:
+            return self.models[name]
+        if name not in self.loaders:
+            raise KeyError(f"Unknown model '{name}'")
+
+        # Per-model lock: a request arriving during warm-up waits for that load
+        with self.load_locks[name]:
+            if name not in self.models:
+                self._load(name)
+        return self.models[name]
+
+    def warm_up(self, names=None):
+        """Load models in a daemon thread so the server can start answering immediately"""
+        names = list(names if names is not None else self.loaders)
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    # Already recorded in info; callers see it on get() or status()
+                    pass
+
+        thread = threading.Thread(target=load_all, name='model-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self, names=None):
+        """True once every named model (default: all registered) has loaded"""
+        names = names if names is not None else list(self.loaders)
+        return all(name in self.models for name in names)
+
+    def status(self):
+        """Snapshot of load state, load time and memory per model"""
+        with self.lock:
+            return {name: dict(info) for name, info in self.info.items()}
+
+    def _load(self, name):
+        """Run the loader and record timing and memory (caller holds the model's load lock)"""
+        self._update_info(name, state='loading', error=None)
+        print(f"Loading model '{name}'...")
+        rss_before = _resident_bytes()
+        start = time.perf_counter()
+        try:
+            model = self.loaders[name]()
+        except Exception as e:
+            print(f"Error loading model '{name}': {str(e)}")
+            traceback.print_exc()
+            self._update_info(name, state='failed', error=str(e))
+            raise
+
+        load_seconds = time.perf_counter() - start
+        rss_after = _resident_bytes()
+        self.models[name] = model
+        self._update_info(
+            name,
+            state='loaded',
+            load_seconds=round(load_seconds, 2),
+            parameter_bytes=_parameter_bytes(model),
+            # Approximate when several models load at once
+            rss_delta_bytes=rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        )
+        print(f"Model '{name}' loaded in {load_seconds:.1f}s")
+
+    def _update_info(self, name, **updates):
+        with self.lock:
+            self.info[name].update(updates)
+
+
+def _parameter_bytes(model):
+    """Bytes held by torch parameters and buffers in a model, pipeline or tuple of them"""
+    if isinstance(model, (tuple, list)):
+        sizes = [_parameter_bytes(part) for part in model]
+        sizes = [size for size in sizes if size is not None]
+        return sum(sizes) if sizes else None
+
+    # transformers pipelines wrap the actual torch module
+    module = getattr(model, 'model', model)
+    if not hasattr(module, 'parameters'):
+        return None
+    total = sum(p.numel() * p.element_size() for p in module.parameters())
+    if hasattr(module, 'buffers'):
+        total += sum(b.numel() * b.element_size() for b in module.buffers())
+    return total
+
+
+def model_revision(model):
+    """Checkpoint commit hash recorded in a loaded transformers model's config, or 'unknown'"""
+    return getattr(model.config, '_commit_hash', None) or 'unknown'
+
+
+def cached_model_revision(repo_id):
+    """Commit hash of the locally cached Hub snapshot of repo_id, without loading it (None if not cached)"""
+    try:
+        from huggingface_hub import try_to_load_from_cache
+        config_path = try_to_load_from_cache(repo_id, 'config.json')
+        if isinstance(config_path, str):
+            # .../models--org--name/snapshots/<commit hash>/config.json
+            return os.path.basename(os.path.dirname(config_path))
+    except Exception as e:
+        print(f"Error looking up cached revision of {repo_id}: {str(e)}")
+    return None
+
+
+def _resident_bytes():
+    """Current resident set size of this process, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _load_captioner():
+    import torch
+    from transformers import pipeline
+    return pipeline(
+        "image-to-text",
+        model="nlpconnect/vit-gpt2-image-captioning",
+        device=0 if torch.cuda.is_available() else -1
+    )
+
+
+def _load_clip():
+    from transformers import CLIPProcessor, CLIPModel
+    model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
+    processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
+    return model, processor
+
+
+def _load_blip():
+    from transformers import BlipProcessor, BlipForConditionalGeneration
+    processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
+    model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
+    return model, processor
+
+
+def _load_sentence_embedder():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer('all-MiniLM-L6-v2')
+
+
+def _load_musicgen():
+    from transformers import MusicgenForConditionalGeneration, AutoProcessor
+    model = MusicgenForConditionalGeneration.from_pretrained("facebook/musicgen-small")
+    processor = AutoProcessor.from_pretrained("facebook/musicgen-small")
+    return model, processor
+
+
+model_registry = ModelRegistry()
+model_registry.register('captioner', _load_captioner)
+model_registry.register('clip', _load_clip)
+model_registry.register('blip', _load_blip)
+model_registry.register('sentence_embedder', _load_sentence_embedder)
+model_registry.register('musicgen', _load_musicgen)
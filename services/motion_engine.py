@@ -0,0 +1,121 @@
+import cv2
+import numpy as np
+from moviepy import VideoClip
+
+
+class MotionEngine:
+    """
+    Ken Burns camera moves rendered with a single affine resample per frame.
+
+    A move is described by a start and end crop rectangle (x, y, width, height)
+    in source pixel coordinates. The rectangle is interpolated linearly over
+    the clip and warped to a fixed output size, so every frame has the same
+    shape and MoviePy never has to recomposite differently sized frames.
+    """
+
+    def __init__(self, interpolation=cv2.INTER_LINEAR):
+        self.interpolation = interpolation
+
+    def animate(self, frame, duration, start_rect, end_rect, output_size=None):
+        """Create a clip that moves the crop window from start_rect to end_rect"""
+        source = self.prepare_source(frame)
+        src_h, src_w = source.shape[:2]
+        out_w, out_h = output_size or (src_w, src_h)
+
+        start = np.asarray(start_rect, dtype=np.float64)
+        delta = np.asarray(end_rect, dtype=np.float64) - start
+
+        # Reused for every frame: the matrix is rewritten in place and
+        # warpAffine resamples straight into the output buffer
+        matrix = np.zeros((2, 3), dtype=np.float64)
+        buffer = np.zeros((out_h, out_w, 3), dtype=np.uint8)
+
+        def make_frame(t):
+            progress = min(max(t / duration, 0.0), 1.0) if duration else 0.0
+            return self.warp(source, start + delta * progress, buffer, matrix)
+
+        return VideoClip(make_frame, duration=duration)
+
+    def warp(self, source, rect, buffer, matrix=None):
+        """Resample the (x, y, w, h) crop of source to fill buffer, returning buffer"""
+        out_h, out_w = buffer.shape[:2]
+        x, y, w, h = rect
+        if matrix is None:
+            matrix = np.zeros((2, 3), dtype=np.float64)
+
+        scale_x = out_w / w
+        scale_y = out_h / h
+        matrix[0, 0] = scale_x
+        matrix[1, 1] = scale_y
+        # Map pixel centres, not corners, so the crop stays centred
+        matrix[0, 2] = (0.5 - x) * scale_x - 0.5
+        matrix[1, 2] = (0.5 - y) * scale_y - 0.5
+
+        cv2.warpAffine(
+            source, matrix, (out_w, out_h),
+            dst=buffer,
+            flags=self.interpolation,
+            borderMode=cv2.BORDER_CONSTANT,
+            borderValue=(0, 0, 0)
+        )
+        return buffer
+
+    def move(self, frame, duration, motion, output_size=None):
+        """Animate a motion spec (see motion_rects)"""
+        h, w = frame.shape[:2]
+        start_rect, end_rect = self.motion_rects(w, h, motion)
+        return self.animate(frame, duration, start_rect, end_rect, output_size)
+
+    def zoom(self, frame, duration, start_zoom, end_zoom, center=(0.5, 0.5), output_size=None):
+        """Zoom around a point given as fractions of the frame size"""
+        return self.move(frame, duration, ('zoom', start_zoom, end_zoom, center, center), output_size)
+
+    def pan(self, frame, duration, direction, amount=0.15, output_size=None):
+        """Pan horizontally across a window that is (1 - amount) of the frame"""
+        return self.move(frame, duration, ('pan', direction, amount), output_size)
+
+    @classmethod
+    def motion_rects(cls, width, height, motion):
+        """
+        Start and end crop rectangles for a motion spec:
+          ('static',)
+          ('zoom', start_zoom, end_zoom, start_center, end_center)
+          ('pan', 'left' | 'right', amount)
+        """
+        kind = motion[0]
+        if kind == 'zoom':
+            _, start_zoom, end_zoom, start_center, end_center = motion
+            return cls.zoom_rect(width, height, start_zoom, start_center), cls.zoom_rect(width, height, end_zoom, end_center)
+        if kind == 'pan':
+            _, direction, amount = motion
+            crop_w, crop_h = width * (1 - amount), height * (1 - amount)
+            spare_w = width - crop_w
+            y = (height - crop_h) / 2
+
+            left_rect = (0.0, y, crop_w, crop_h)
+            right_rect = (spare_w, y, crop_w, crop_h)
+            if direction == 'left':
+                return right_rect, left_rect
+            return left_rect, right_rect
+        full_rect = (0.0, 0.0, float(width), float(height))
+        return full_rect, full_rect
+
+    @staticmethod
+    def zoom_rect(width, height, zoom, center=(0.5, 0.5)):
+        """Crop rectangle that shows the frame magnified by zoom, kept inside the frame"""
+        crop_w, crop_h = width / zoom, height / zoom
+        x = min(max(center[0] * width - crop_w / 2, 0.0), width - crop_w)
+        y = min(max(center[1] * height - crop_h / 2, 0.0), height - crop_h)
+        return (x, y, crop_w, crop_h)
+
+    @staticmethod
+    def prepare_source(frame):
+        """Return a contiguous uint8 RGB array for warpAffine"""
+        source = np.asarray(frame)
+        if source.ndim == 2:
+            source = np.stack([source] * 3, axis=-1)
+        elif source.shape[2] == 4:
+            source = source[..., :3]
+        if source.dtype != np.uint8:
+            source = np.clip(source, 0, 255).astype(np.uint8)
+        return np.ascontiguousarray(source)
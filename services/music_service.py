@@ -1,19 +1,41 @@
-import os
-import numpy as np
-from moviepy import AudioClip, CompositeAudioClip
-import random
+from services.stem_cache import stem_cache
+
+# Three-note chords per style (see services.audio_synth.synthesize_recipe)
+MUSIC_SERVICE_RECIPES = {
+    'upbeat': {
+        'voices': [(440, 0.3), (554, 0.2), (659, 0.2)],  # A4 C#5 E5
+        'pulse': (2, 0.1)  # Rhythm
+    },
+    'nostalgic': {
+        'voices': [(330, 0.4), (415, 0.3), (523, 0.2)],  # E4 G#4 C5
+        'tempo': 0.5,
+        'pulse': (5, 0.1)  # Vibrato
+    },
+    'romantic': {
+        'voices': [(392, 0.3), (494, 0.2), (587, 0.2)],  # G4 B4 D5
+        'envelope': ('attack', 0.1, 1, 0.5)  # Soft attack
+    },
+    'energetic': {
+        'voices': [(523, 0.3), (659, 0.2), (784, 0.2)],  # C5 E5 G5
+        'tempo': 2.0,
+        'pulse': (4, 0.1)  # Percussion
+    },
+    'calm': {
+        'voices': [(220, 0.4), (277, 0.3), (330, 0.2)],  # A3 C#4 E4
+        'tempo': 0.3
+    }
+}
+DEFAULT_MUSIC_RECIPE = {'voices': [(440, 0.2)]}  # A4
+
 
 class MusicService:
     def __init__(self):
         self.music_folder = 'static/music'
         self.sample_music = {
-            'upbeat': self._create_upbeat_music,
-            'nostalgic': self._create_nostalgic_music,
-            'romantic': self._create_romantic_music,
-            'energetic': self._create_energetic_music,
-            'calm': self._create_calm_music
+            style: (lambda duration, recipe=recipe: stem_cache.clip(recipe, duration))
+            for style, recipe in MUSIC_SERVICE_RECIPES.items()
         }
-    
+
     def get_background_music(self, music_style, duration):
         """Generate background music based on style and duration"""
         try:
@@ -24,109 +46,7 @@ class MusicService:
         except Exception as e:
             print(f"Error generating music: {str(e)}")
             return self._create_default_music(duration)
-    
-    def _create_upbeat_music(self, duration):
-        """Create upbeat, happy music"""
-        def make_frame(t):
-            # Create a simple melody with multiple frequencies
-            freq1 = 440  # A4 note
-            freq2 = 554  # C#5 note
-            freq3 = 659  # E5 note
-            
-            # Create a simple chord progression
-            wave1 = np.sin(2 * np.pi * freq1 * t) * 0.3
-            wave2 = np.sin(2 * np.pi * freq2 * t) * 0.2
-            wave3 = np.sin(2 * np.pi * freq3 * t) * 0.2
-            
-            # Add some rhythm
-            rhythm = np.sin(2 * np.pi * 2 * t) * 0.1
-            
-            return wave1 + wave2 + wave3 + rhythm
-        
-        return AudioClip(make_frame, duration=duration)
-    
-    def _create_nostalgic_music(self, duration):
-        """Create nostalgic, emotional music"""
-        def make_frame(t):
-            # Slower, more emotional frequencies
-            freq1 = 330  # E4 note
-            freq2 = 415  # G#4 note
-            freq3 = 523  # C5 note
-            
-            # Slower tempo
-            wave1 = np.sin(2 * np.pi * freq1 * t * 0.5) * 0.4
-            wave2 = np.sin(2 * np.pi * freq2 * t * 0.5) * 0.3
-            wave3 = np.sin(2 * np.pi * freq3 * t * 0.5) * 0.2
-            
-            # Add some vibrato
-            vibrato = np.sin(2 * np.pi * 5 * t) * 0.1
-            
-            return wave1 + wave2 + wave3 + vibrato
-    
-        return AudioClip(make_frame, duration=duration)
-    
-    def _create_romantic_music(self, duration):
-        """Create romantic, soft music"""
-        def make_frame(t):
-            # Soft, romantic frequencies
-            freq1 = 392  # G4 note
-            freq2 = 494  # B4 note
-            freq3 = 587  # D5 note
-            
-            # Soft attack
-            envelope = np.exp(-t * 0.1) if t < 1 else 0.5
-            
-            wave1 = np.sin(2 * np.pi * freq1 * t) * 0.3 * envelope
-            wave2 = np.sin(2 * np.pi * freq2 * t) * 0.2 * envelope
-            wave3 = np.sin(2 * np.pi * freq3 * t) * 0.2 * envelope
-            
-            return wave1 + wave2 + wave3
-    
-        return AudioClip(make_frame, duration=duration)
-    
-    def _create_energetic_music(self, duration):
-        """Create energetic, fast-paced music"""
-        def make_frame(t):
-            # Higher frequencies for energy
-            freq1 = 523  # C5 note
-            freq2 = 659  # E5 note
-            freq3 = 784  # G5 note
-            
-            # Fast tempo
-            wave1 = np.sin(2 * np.pi * freq1 * t * 2) * 0.3
-            wave2 = np.sin(2 * np.pi * freq2 * t * 2) * 0.2
-            wave3 = np.sin(2 * np.pi * freq3 * t * 2) * 0.2
-            
-            # Add some percussion-like rhythm
-            percussion = np.sin(2 * np.pi * 4 * t) * 0.1
-            
-            return wave1 + wave2 + wave3 + percussion
-    
-        return AudioClip(make_frame, duration=duration)
-    
-    def _create_calm_music(self, duration):
-        """Create calm, peaceful music"""
-        def make_frame(t):
-            # Low, peaceful frequencies
-            freq1 = 220  # A3 note
-            freq2 = 277  # C#4 note
-            freq3 = 330  # E4 note
-            
-            # Very slow tempo
-            wave1 = np.sin(2 * np.pi * freq1 * t * 0.3) * 0.4
-            wave2 = np.sin(2 * np.pi * freq2 * t * 0.3) * 0.3
-            wave3 = np.sin(2 * np.pi * freq3 * t * 0.3) * 0.2
-            
-            return wave1 + wave2 + wave3
-    
-        return AudioClip(make_frame, duration=duration)
-    
+
     def _create_default_music(self, duration):
         """Create default background music"""
-        def make_frame(t):
-            # Simple, pleasant melody
-            freq = 440  # A4 note
-            wave = np.sin(2 * np.pi * freq * t) * 0.2
-            return wave
-    
-        return AudioClip(make_frame, duration=duration)
+        return stem_cache.clip(DEFAULT_MUSIC_RECIPE, duration)
@@ -0,0 +1,167 @@
+import os
+import glob
+import math
+import queue
+import time
+import uuid
+import hashlib
+import threading
+import numpy as np
+from services.model_registry import model_registry
+from config import MUSICGEN_FOLDER, MUSICGEN_CHUNK_SECONDS, MUSICGEN_DURATION_BUCKET, MUSICGEN_PROMPT_SECONDS, MUSICGEN_RETRY_SECONDS
+
+
+def generate_musicgen_chunk(prompt, seconds, audio_prompt=None):
+    """
+    Generate seconds of new audio with MusicGen; returns (mono float32 audio, sampling rate).
+
+    With audio_prompt (mono samples at the model's sampling rate) MusicGen
+    continues that audio, and only the continuation is returned.
+    """
+    import torch
+    model, processor = model_registry.get('musicgen')
+    audio_config = model.config.audio_encoder
+
+    if audio_prompt is None:
+        inputs = processor(text=[prompt], padding=True, return_tensors="pt")
+    else:
+        inputs = processor(audio=np.asarray(audio_prompt, dtype=np.float32), sampling_rate=audio_config.sampling_rate,
+                           text=[prompt], padding=True, return_tensors="pt")
+    with torch.inference_mode():
+        audio_values = model.generate(
+            **inputs,
+            max_new_tokens=int(math.ceil(seconds * audio_config.frame_rate)),
+            do_sample=True,
+            guidance_scale=3.0
+        )
+    audio = audio_values[0, 0].cpu().numpy().astype(np.float32)
+    # The decoded sequence starts with the prompt audio
+    if audio_prompt is not None:
+        audio = audio[len(audio_prompt):]
+    return audio, audio_config.sampling_rate
+
+
+class MusicGenWorker:
+    def __init__(self, cache_folder=MUSICGEN_FOLDER, chunk_seconds=MUSICGEN_CHUNK_SECONDS, duration_bucket=MUSICGEN_DURATION_BUCKET,
+                 prompt_seconds=MUSICGEN_PROMPT_SECONDS, retry_seconds=MUSICGEN_RETRY_SECONDS, generate_chunk=generate_musicgen_chunk):
+        """
+        Generates MusicGen tracks on a background thread, off the render path.
+
+        Tracks are cached in memory and as .npy files keyed by a hash of
+        (style, context) plus the duration bucket. get() only ever returns
+        a finished track or None; a miss queues the generation so a later
+        render of the same style and context finds it ready. Long tracks
+        are generated chunk_seconds at a time, each chunk continuing the
+        last prompt_seconds of the track so far, which keeps them one piece
+        of music. A track that failed is not queued again for retry_seconds.
+        """
+        self.cache_folder = cache_folder
+        self.chunk_seconds = chunk_seconds
+        self.duration_bucket = duration_bucket
+        self.prompt_seconds = prompt_seconds
+        self.retry_seconds = retry_seconds
+        self.generate_chunk = generate_chunk
+        self.tracks = {}
+        self.pending = set()
+        self.errors = {}  # key -> (message, time of failure)
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        os.makedirs(cache_folder, exist_ok=True)
+
+    def get(self, style, prompt, duration, context=''):
+        """Return (audio, sampling_rate) if a track covering duration is cached, else queue it and return None"""
+        key, _ = self._key(style, context, duration)
+        track = self._lookup(key)
+        if track is not None:
+            return track
+        self.request(style, prompt, duration, context)
+        return None
+
+    def request(self, style, prompt, duration, context=''):
+        """Queue generation of a track unless it is cached, already queued or recently failed"""
+        key, bucket = self._key(style, context, duration)
+        with self.lock:
+            if key in self.pending or key in self.tracks:
+                return
+            error = self.errors.get(key)
+            if error and time.time() - error[1] < self.retry_seconds:
+                return
+            self.pending.add(key)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='musicgen-worker', daemon=True)
+                self.thread.start()
+        self.jobs.put((key, prompt, bucket))
+        print(f"Queued MusicGen track {key} ({bucket}s)")
+
+    def join(self):
+        """Block until every queued track has been generated (or failed)"""
+        self.jobs.join()
+
+    def _key(self, style, context, duration):
+        bucket = max(1, math.ceil(duration / self.duration_bucket)) * self.duration_bucket
+        # Style and context come from clients, so only their hash reaches the file system
+        track_hash = hashlib.sha256(f"{style}\0{context or ''}".encode()).hexdigest()[:16]
+        return f"{track_hash}_{bucket}s", bucket
+
+    def _lookup(self, key):
+        with self.lock:
+            track = self.tracks.get(key)
+        if track is not None:
+            return track
+
+        for path in glob.glob(os.path.join(self.cache_folder, f"{key}@*hz.npy")):
+            try:
+                sampling_rate = int(path.rsplit('@', 1)[1][:-len('hz.npy')])
+                track = (np.load(path, mmap_mode='r'), sampling_rate)
+                with self.lock:
+                    self.tracks[key] = track
+                return track
+            except Exception as e:
+                print(f"Error loading MusicGen track {path}: {str(e)}")
+        return None
+
+    def _run(self):
+        while True:
+            key, prompt, seconds = self.jobs.get()
+            try:
+                audio, sampling_rate = self._generate(prompt, seconds)
+                audio.setflags(write=False)
+                self._save(key, audio, sampling_rate)
+                with self.lock:
+                    self.tracks[key] = (audio, sampling_rate)
+                    self.errors.pop(key, None)
+                print(f"Generated MusicGen track {key}: {len(audio) / sampling_rate:.1f}s at {sampling_rate} Hz")
+            except Exception as e:
+                print(f"Error generating MusicGen track {key}: {str(e)}")
+                with self.lock:
+                    self.errors[key] = (str(e), time.time())
+            finally:
+                with self.lock:
+                    self.pending.discard(key)
+                self.jobs.task_done()
+
+    def _generate(self, prompt, seconds):
+        """Generate chunks until seconds are covered, each continuing the tail of the track so far"""
+        audio, sampling_rate = self.generate_chunk(prompt, self.chunk_seconds)
+        track = np.asarray(audio, dtype=np.float32)
+        prompt_samples = max(1, int(self.prompt_seconds * sampling_rate))
+        while len(track) < seconds * sampling_rate:
+            audio, _ = self.generate_chunk(prompt, self.chunk_seconds, audio_prompt=track[-prompt_samples:])
+            if len(audio) == 0:
+                raise ValueError("MusicGen returned no audio to continue the track with")
+            track = np.concatenate([track, np.asarray(audio, dtype=np.float32)])
+        return track[:int(seconds * sampling_rate)], sampling_rate
+
+    def _save(self, key, audio, sampling_rate):
+        path = os.path.join(self.cache_folder, f"{key}@{sampling_rate}hz.npy")
+        try:
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temp_path, 'wb') as f:
+                np.save(f, audio)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Error caching MusicGen track {path}: {str(e)}")
+
+
+musicgen_worker = MusicGenWorker()
@@ -0,0 +1,165 @@
+import os
+import hashlib
+import numpy as np
+import torch
+from PIL import Image
+from typing import List
+from services.caption_cache import CaptionCache
+from services.content_hash import resolve_photo_path, photo_content_hash
+from services.model_registry import model_registry, model_revision
+from config import INFERENCE_BATCH_SIZE, SCENE_EMBEDDINGS_FOLDER
+
+# Scene classification templates
+SCENE_TEMPLATES = [
+    "a family gathering with people",
+    "a romantic couple moment",
+    "a travel adventure scene",
+    "a party celebration event",
+    "a nature landscape view",
+    "a dramatic important moment",
+    "a peaceful calm scene",
+    "a business professional setting"
+]
+
+
+class PhotoAnalysisMixin:
+    """
+    BLIP captioning, CLIP embedding and scene classification shared by the
+    context generators. Call _init_photo_analysis() from __init__.
+    """
+
+    def _init_photo_analysis(self):
+        # CLIP for semantic embeddings and BLIP for better image captioning,
+        # shared with any other service through the model registry
+        self.clip_model, self.clip_processor = model_registry.get('clip')
+        self.blip_model, self.blip_processor = model_registry.get('blip')
+        self.scene_templates = SCENE_TEMPLATES
+        
+        # Cached captions, scenes and embeddings are only valid for the same
+        # checkpoints and the same scene templates
+        self.caption_cache = CaptionCache()
+        self.cache_model = f"{self.blip_model.config._name_or_path}+{self.clip_model.config._name_or_path}"
+        templates_hash = hashlib.sha256("\n".join(self.scene_templates).encode('utf-8')).hexdigest()[:12]
+        revisions = "+".join(model_revision(model)[:12] for model in (self.blip_model, self.clip_model))
+        self.cache_version = f"{revisions}-{templates_hash}"
+        self.batch_size = INFERENCE_BATCH_SIZE
+        
+        # Templates never change, so encode them once rather than per photo
+        self.scene_embeddings = self._load_scene_embeddings()
+
+    def _analyze_photos(self, photo_paths: List[str]) -> List[tuple]:
+        """Return (caption, embedding, scene) per photo, running the models only on cache misses"""
+        results = [None] * len(photo_paths)
+        misses = []
+        for i, photo_path in enumerate(photo_paths):
+            content_hash = photo_content_hash(photo_path)
+            cached = self.caption_cache.get(content_hash, self.cache_model, self.cache_version)
+            if cached and cached.get('embedding') is not None:
+                results[i] = (cached['caption'], cached['embedding'], cached['scene'])
+            else:
+                misses.append((i, content_hash))
+        
+        for start in range(0, len(misses), self.batch_size):
+            batch = misses[start:start + self.batch_size]
+            print(f"Processing photos {start + 1}-{start + len(batch)} of {len(misses)} uncached")
+            
+            # Load and process images
+            images = [Image.open(resolve_photo_path(photo_paths[i])).convert('RGB') for i, _ in batch]
+            
+            # Generate BLIP captions, CLIP embeddings and scenes for the whole batch
+            captions = self._generate_blip_captions(images)
+            embeddings = self._generate_clip_embeddings(images)
+            scenes = self._classify_scenes(embeddings)
+            
+            for (i, content_hash), caption, embedding, scene in zip(batch, captions, embeddings, scenes):
+                # Don't cache the fallbacks returned when a model call failed
+                if embedding.any() and caption != "A photo":
+                    self.caption_cache.put(content_hash, self.cache_model, self.cache_version, {
+                        'caption': caption,
+                        'scene': scene,
+                        'embedding': embedding
+                    })
+                results[i] = (caption, embedding, scene)
+        
+        return results
+
+    def _generate_blip_captions(self, images: List[Image.Image]) -> List[str]:
+        """Generate BLIP captions for a batch of images in one generate call"""
+        try:
+            inputs = self.blip_processor(images=images, return_tensors="pt")
+            with torch.inference_mode():
+                out = self.blip_model.generate(**inputs, max_length=50, num_beams=5)
+            return self.blip_processor.batch_decode(out, skip_special_tokens=True)
+        except Exception as e:
+            print(f"Error generating batched BLIP captions, captioning one by one: {str(e)}")
+            return [self._generate_blip_caption(image) for image in images]
+
+    def _generate_clip_embeddings(self, images: List[Image.Image]) -> List[np.ndarray]:
+        """Generate normalized CLIP embeddings for a batch of images in one forward pass"""
+        try:
+            inputs = self.clip_processor(images=images, return_tensors="pt")
+            with torch.inference_mode():
+                image_features = self.clip_model.get_image_features(**inputs)
+                image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+            return list(image_features.numpy())
+        except Exception as e:
+            print(f"Error generating batched CLIP embeddings, embedding one by one: {str(e)}")
+            return [self._generate_clip_embedding(image) for image in images]
+
+    def _generate_blip_caption(self, image: Image.Image) -> str:
+        """Generate caption using BLIP model"""
+        try:
+            inputs = self.blip_processor(image, return_tensors="pt")
+            with torch.inference_mode():
+                out = self.blip_model.generate(**inputs, max_length=50, num_beams=5)
+            caption = self.blip_processor.decode(out[0], skip_special_tokens=True)
+            return caption
+        except Exception as e:
+            print(f"Error generating BLIP caption: {str(e)}")
+            return "A photo"
+
+    def _generate_clip_embedding(self, image: Image.Image) -> np.ndarray:
+        """Generate CLIP embedding for semantic similarity"""
+        try:
+            inputs = self.clip_processor(images=image, return_tensors="pt")
+            with torch.inference_mode():
+                image_features = self.clip_model.get_image_features(**inputs)
+                # Normalize embeddings
+                image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+                return image_features.numpy().flatten()
+        except Exception as e:
+            print(f"Error generating CLIP embedding: {str(e)}")
+            return np.zeros(512)  # Default embedding size
+
+    def _load_scene_embeddings(self) -> np.ndarray:
+        """Encode scene templates with CLIP, reusing the copy saved for the same templates and models"""
+        embeddings_path = os.path.join(SCENE_EMBEDDINGS_FOLDER, f"{self.cache_version}.npy")
+        if os.path.exists(embeddings_path):
+            try:
+                return np.load(embeddings_path)
+            except Exception as e:
+                print(f"Error loading scene embeddings, recomputing: {str(e)}")
+        
+        text_inputs = self.clip_processor(text=self.scene_templates, return_tensors="pt", padding=True)
+        with torch.inference_mode():
+            text_features = self.clip_model.get_text_features(**text_inputs)
+            text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+        scene_embeddings = text_features.numpy().astype(np.float32)
+        
+        try:
+            os.makedirs(SCENE_EMBEDDINGS_FOLDER, exist_ok=True)
+            np.save(embeddings_path, scene_embeddings)
+        except Exception as e:
+            print(f"Error saving scene embeddings: {str(e)}")
+        
+        return scene_embeddings
+
+    def _classify_scenes(self, embeddings: List[np.ndarray]) -> List[str]:
+        """Classify photos by cosine similarity to the scene templates in one matrix multiply"""
+        try:
+            # Photo and template embeddings are both normalized, so the dot product is the cosine
+            similarities = np.stack(embeddings).astype(np.float32) @ self.scene_embeddings.T
+            return [self.scene_templates[idx] for idx in similarities.argmax(axis=1)]
+        except Exception as e:
+            print(f"Error classifying scenes: {str(e)}")
+            return ["a general photo scene"] * len(embeddings)
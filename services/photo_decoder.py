@@ -0,0 +1,84 @@
+import os
+import math
+import uuid
+from PIL import Image, ImageOps
+from services.content_hash import resolve_photo_path, photo_content_hash
+from services.photo_metadata import ROTATED_ORIENTATIONS, EXIF_ORIENTATION
+from config import WORKING_COPY_FOLDER, WORKING_COPY_QUALITY, DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT
+
+
+def decode_photo(path, target_size=(DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT)):
+    """
+    Decode a photo scaled to fit inside target_size, upright and in RGB.
+
+    For JPEGs, Image.draft asks libjpeg to decode at 1/2, 1/4 or 1/8 scale
+    straight from the DCT coefficients, so a 48 MP phone photo never exists
+    at full size in memory. One LANCZOS resample then gives the exact size.
+    """
+    target_w, target_h = target_size
+    with Image.open(path) as img:
+        try:
+            orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+        except Exception:
+            orientation = 1
+
+        # Fit in the stored orientation; exif_transpose rotates afterwards
+        src_w, src_h = img.size
+        box_w, box_h = (target_h, target_w) if orientation in ROTATED_ORIENTATIONS else (target_w, target_h)
+        scale = min(box_w / src_w, box_h / src_h)
+        fit_size = (max(1, round(src_w * scale)), max(1, round(src_h * scale)))
+
+        # draft picks the smallest scale that is still at least the requested size
+        img.draft('RGB', (math.ceil(src_w * scale), math.ceil(src_h * scale)))
+
+        image = ImageOps.exif_transpose(img)
+        image = image.convert('RGB')
+
+    if orientation in ROTATED_ORIENTATIONS:
+        fit_size = (fit_size[1], fit_size[0])
+    if image.size != fit_size:
+        image = image.resize(fit_size, Image.Resampling.LANCZOS)
+    return image
+
+
+class PhotoDecoder:
+    def __init__(self, cache_folder=WORKING_COPY_FOLDER, quality=WORKING_COPY_QUALITY):
+        """
+        Produces reduced-resolution working copies of photos.
+
+        Working copies are cached on disk as <content hash>_<WxH>.jpg, so a
+        photo is only decoded at source resolution once per target size.
+        """
+        self.cache_folder = cache_folder
+        self.quality = quality
+        os.makedirs(cache_folder, exist_ok=True)
+
+    def decode(self, photo, target_size=(DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT)):
+        """Return the photo (blob ID or path) as an RGB image fitted inside target_size"""
+        working_path = self._working_path(photo, target_size)
+        if os.path.exists(working_path):
+            with Image.open(working_path) as img:
+                return img.convert('RGB')
+        return self._create_working_copy(photo, target_size, working_path)
+
+    def working_copy(self, photo, target_size=(DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT)):
+        """Return the path of the cached working copy, creating it if needed"""
+        working_path = self._working_path(photo, target_size)
+        if not os.path.exists(working_path):
+            self._create_working_copy(photo, target_size, working_path)
+        return working_path
+
+    def _create_working_copy(self, photo, target_size, working_path):
+        image = decode_photo(resolve_photo_path(photo), target_size)
+        try:
+            # Write then rename so concurrent renders never read a half-written file
+            temp_path = f"{working_path}.{uuid.uuid4().hex}.tmp"
+            image.save(temp_path, 'JPEG', quality=self.quality)
+            os.replace(temp_path, working_path)
+        except Exception as e:
+            print(f"Error caching working copy for {photo}: {str(e)}")
+        return image
+
+    def _working_path(self, photo, target_size):
+        width, height = target_size
+        return os.path.join(self.cache_folder, f"{photo_content_hash(photo)}_{width}x{height}.jpg")
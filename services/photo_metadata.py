@@ -0,0 +1,177 @@
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from PIL import Image
+from services.content_hash import resolve_photo_path, photo_content_hash
+from config import METADATA_WORKERS, METADATA_CACHE_MAX_ENTRIES, UPLOAD_HEADER_BYTES
+
+# EXIF tags used for ordering and orienting photos
+EXIF_DATETIME = 306
+EXIF_DATETIME_ORIGINAL = 36867
+EXIF_ORIENTATION = 274
+EXIF_IFD = 0x8769
+GPS_IFD = 0x8825
+
+# Orientations 5-8 are rotated by 90 degrees, so width and height swap on display
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+FORMAT_EXTENSIONS = {
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'GIF': 'gif',
+    'BMP': 'bmp'
+}
+
+
+def read_image_metadata(source):
+    """
+    Read format, dimensions and key EXIF fields without decoding pixels.
+
+    source is a path, a file object or the leading bytes of an image. PIL only
+    parses the header when opening, so a prefix that covers the EXIF block is
+    enough; pixel data is never touched.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    with Image.open(source) as img:
+        width, height = img.size
+        metadata = {
+            'format': img.format,
+            'mode': img.mode,
+            'width': width,
+            'height': height,
+            'orientation': 1,
+            'datetime_original': None,
+            'gps': None
+        }
+
+        try:
+            exif = img.getexif()
+        except Exception:
+            exif = None
+        if not exif:
+            metadata['oriented_size'] = (width, height)
+            return metadata
+
+        metadata['orientation'] = exif.get(EXIF_ORIENTATION, 1)
+
+        # DateTimeOriginal lives in the Exif sub-IFD; DateTime (306) is the fallback
+        try:
+            datetime_original = exif.get_ifd(EXIF_IFD).get(EXIF_DATETIME_ORIGINAL)
+        except Exception:
+            datetime_original = None
+        metadata['datetime_original'] = _clean_exif_string(datetime_original or exif.get(EXIF_DATETIME))
+
+        try:
+            metadata['gps'] = _parse_gps(exif.get_ifd(GPS_IFD))
+        except Exception:
+            metadata['gps'] = None
+
+    if metadata['orientation'] in ROTATED_ORIENTATIONS:
+        metadata['oriented_size'] = (height, width)
+    else:
+        metadata['oriented_size'] = (width, height)
+    return metadata
+
+
+def read_file_metadata(path, header_bytes=UPLOAD_HEADER_BYTES):
+    """Read metadata from the first header_bytes of a file, reopening it only if EXIF runs past them"""
+    with open(path, 'rb') as f:
+        header = f.read(header_bytes)
+    try:
+        return read_image_metadata(header)
+    except Exception:
+        # PIL opens lazily, so even the fallback only reads the header
+        return read_image_metadata(path)
+
+
+def exif_timestamp(value):
+    """Convert an EXIF 'YYYY:MM:DD HH:MM:SS' string to a POSIX timestamp, or None"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:19], '%Y:%m:%d %H:%M:%S').timestamp()
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+class PhotoMetadataIndex:
+    def __init__(self, max_workers=METADATA_WORKERS, max_entries=METADATA_CACHE_MAX_ENTRIES, header_bytes=UPLOAD_HEADER_BYTES):
+        """
+        In-memory index of photo metadata keyed by content hash.
+
+        Only the header bytes of each photo are read, never the pixels, and
+        albums are indexed in a thread pool so ordering is bound by I/O
+        rather than decoding. Ordering, processing and clip creation all
+        share one index, so each photo is read at most once.
+        """
+        self.max_entries = max_entries
+        self.header_bytes = header_bytes
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='photo-metadata')
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, photo):
+        """Return metadata for a blob ID or file path, or None if it cannot be read"""
+        try:
+            content_hash = photo_content_hash(photo)
+        except OSError as e:
+            print(f"Error reading metadata for {photo}: {str(e)}")
+            return None
+
+        with self.lock:
+            if content_hash in self.entries:
+                self.entries.move_to_end(content_hash)
+                return self.entries[content_hash]
+
+        try:
+            metadata = read_file_metadata(resolve_photo_path(photo), self.header_bytes)
+        except Exception as e:
+            print(f"Error reading metadata for {photo}: {str(e)}")
+            return None
+
+        metadata['content_hash'] = content_hash
+        metadata['timestamp'] = exif_timestamp(metadata['datetime_original'])
+
+        with self.lock:
+            self.entries[content_hash] = metadata
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return metadata
+
+    def get_many(self, photos):
+        """Index photos in parallel and return their metadata in input order"""
+        return list(self.executor.map(self.get, photos))
+
+
+def _clean_exif_string(value):
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode('ascii', errors='ignore')
+    value = str(value).strip('\x00 ')
+    return value or None
+
+
+def _parse_gps(gps_ifd):
+    """Convert EXIF GPS rationals to signed decimal degrees, or None"""
+    if not gps_ifd or 2 not in gps_ifd or 4 not in gps_ifd:
+        return None
+
+    def to_degrees(values):
+        degrees, minutes, seconds = (float(v) for v in values)
+        return degrees + minutes / 60 + seconds / 3600
+
+    latitude = to_degrees(gps_ifd[2])
+    longitude = to_degrees(gps_ifd[4])
+    if _clean_exif_string(gps_ifd.get(1)) == 'S':
+        latitude = -latitude
+    if _clean_exif_string(gps_ifd.get(3)) == 'W':
+        longitude = -longitude
+    return {'latitude': round(latitude, 6), 'longitude': round(longitude, 6)}
+
+
+photo_metadata_index = PhotoMetadataIndex()
@@ -0,0 +1,128 @@
+import os
+import time
+import uuid
+import threading
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from PIL import Image
+from services.content_hash import photo_content_hash
+from services.photo_decoder import PhotoDecoder
+from services.process_pool import worker_context
+from config import PREPROCESS_WORKERS, FRAME_CACHE_FOLDER, WORKING_COPY_FOLDER, DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT
+
+
+def letterbox(image, size):
+    """Centre an image fitted inside size on a black canvas of exactly size"""
+    width, height = size
+    canvas = Image.new('RGB', (width, height), (0, 0, 0))
+    paste_x = (width - image.size[0]) // 2
+    paste_y = (height - image.size[1]) // 2
+    canvas.paste(image, (paste_x, paste_y))
+    return canvas
+
+
+def normalized_frame_path(folder, photo, size):
+    """<content hash>_<WxH>.npy: the one on-disk location of a photo's normalized frame"""
+    width, height = size
+    return os.path.join(folder, f"{photo_content_hash(photo)}_{width}x{height}.npy")
+
+
+def normalize_frame(photo, size, decoder):
+    """Decode, fit and letterbox a photo into a (height, width, 3) uint8 frame"""
+    return np.asarray(letterbox(decoder.decode(photo, size), size), dtype=np.uint8)
+
+
+def save_frame(path, frame):
+    """Write a frame as a raw .npy file, atomically so readers never map a partial file"""
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, 'wb') as f:
+        np.save(f, frame)
+    os.replace(temp_path, path)
+
+
+def preprocess_photo(photo, target_size, output_folder, working_folder, return_frame=False):
+    """
+    Normalize one photo into the frame cache's .npy tier (see services.frame_cache).
+
+    Top-level so it can be sent to worker processes, and silent so the
+    parent reports progress in input order. Never raises; errors are
+    reported in the result so one bad photo cannot fail the batch.
+    """
+    start = time.perf_counter()
+    result = {'photo': photo, 'path': None, 'frame': None, 'cached': False, 'seconds': 0.0, 'error': None}
+    try:
+        path = normalized_frame_path(output_folder, photo, target_size)
+        if os.path.exists(path):
+            result['cached'] = True
+            frame = np.load(path, mmap_mode='r') if return_frame else None
+        else:
+            frame = normalize_frame(photo, target_size, PhotoDecoder(working_folder))
+            save_frame(path, frame)
+
+        result['path'] = path
+        if return_frame:
+            result['frame'] = np.asarray(frame)
+    except Exception as e:
+        result['error'] = str(e)
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+class PhotoPreprocessor:
+    def __init__(self, max_workers=PREPROCESS_WORKERS, target_size=(DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT),
+                 output_folder=FRAME_CACHE_FOLDER, working_folder=WORKING_COPY_FOLDER):
+        """
+        Decode, fit and letterbox photos on a process pool.
+
+        Frames are written as the frame cache's .npy files, so renders map
+        them instead of decoding. Results come back in input order, one dict
+        per photo with the frame file path (and optionally the frame array),
+        whether it was already cached, how long it took, and any error.
+        """
+        self.max_workers = max(1, max_workers)
+        self.target_size = target_size
+        self.output_folder = output_folder
+        self.working_folder = working_folder
+        self.executor = None
+        self.lock = threading.Lock()
+        os.makedirs(output_folder, exist_ok=True)
+
+    def run(self, photos, return_frames=False):
+        """Normalize all photos, in parallel when there is more than one"""
+        start = time.perf_counter()
+        args = (repeat(self.target_size), repeat(self.output_folder), repeat(self.working_folder), repeat(return_frames))
+
+        if self.max_workers == 1 or len(photos) <= 1:
+            results = list(map(preprocess_photo, photos, *args))
+        else:
+            try:
+                results = list(self._get_executor().map(preprocess_photo, photos, *args))
+            except BrokenProcessPool as e:
+                print(f"Preprocessing pool failed, continuing in-process: {str(e)}")
+                with self.lock:
+                    self.executor = None
+                results = list(map(preprocess_photo, photos, *args))
+
+        for result in results:
+            status = 'error: ' + result['error'] if result['error'] else ('cached' if result['cached'] else 'done')
+            print(f"Preprocessed {result['photo']} in {result['seconds'] * 1000:.0f} ms ({status})")
+        print(f"Preprocessed {len(photos)} photos in {time.perf_counter() - start:.2f}s with {self.max_workers} workers")
+        return results
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+
+    def _get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=worker_context())
+            return self.executor
+
+
+photo_preprocessor = PhotoPreprocessor()
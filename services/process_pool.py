@@ -0,0 +1,19 @@
+import multiprocessing
+
+
+# Modules the fork server imports once so each worker starts with them loaded
+WORKER_MODULES = ['services.preprocess', 'services.ffmpeg_renderer']
+
+
+def worker_context():
+    """
+    Multiprocessing context for the app's process pools.
+
+    Workers are started by a fork server, never forked from the multithreaded
+    app process (a lock held by another thread at fork time would deadlock the
+    child). The fork server preloads the worker modules instead of the default
+    '__main__', so it never runs the app's start-up code itself.
+    """
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(WORKER_MODULES)
+    return context
@@ -0,0 +1,73 @@
+import numpy as np
+from services.lru import LRUCache, SQLiteLRU
+from config import RAG_QUERY_CACHE_ENTRIES, RAG_QUERY_CACHE_PATH, RAG_QUERY_CACHE_DISK_ENTRIES
+
+
+def normalize_query(text):
+    """Collapse whitespace and lowercase (MiniLM is uncased, so the embedding is unchanged)"""
+    return ' '.join(text.split()).lower()
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_entries=RAG_QUERY_CACHE_ENTRIES, db_path=RAG_QUERY_CACHE_PATH, max_disk_entries=RAG_QUERY_CACHE_DISK_ENTRIES):
+        """
+        LRU cache of query embeddings, keyed by model and normalized query text.
+
+        Planning contexts are highly repetitive, so most semantic searches
+        can skip the sentence encoder. The in-memory LRU holds max_entries
+        vectors; when db_path is set, misses fall through to a larger SQLite
+        tier of max_disk_entries that survives restarts and is shared
+        between processes.
+        """
+        self.max_entries = max_entries
+        self.entries = LRUCache(max_entries)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.store = None
+        if db_path:
+            self.store = SQLiteLRU(
+                db_path, 'query_embeddings',
+                key_columns=('model', 'query'),
+                value_columns=(('embedding', 'BLOB NOT NULL'),),
+                max_entries=max_disk_entries
+            )
+
+    def get(self, model, query):
+        """Return the cached read-only float32 embedding of a normalized query, or None"""
+        key = (model, query)
+        embedding = self.entries.get(key)
+        if embedding is not None:
+            self.hits += 1
+            return embedding
+
+        row = self.store.get(key) if self.store else None
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        embedding = np.frombuffer(row[0], dtype=np.float32)
+        self.entries.put(key, embedding)
+        return embedding
+
+    def put(self, model, query, embedding):
+        """Store the embedding of a normalized query in memory and, if enabled, on disk"""
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        self.entries.put((model, query), embedding)
+        if self.store:
+            self.store.put((model, query), (embedding.tobytes(),))
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current entry counts"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            'entries': len(self.entries),
+            'disk_entries': self.store.count() if self.store else 0,
+            'max_entries': self.max_entries
+        }
@@ -0,0 +1,99 @@
+import time
+import uuid
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from config import RENDER_WORKERS, MAX_PENDING_RENDER_JOBS, RENDER_JOB_TTL
+
+
+class RenderQueueFull(Exception):
+    """Raised when too many render jobs are already waiting for a worker"""
+
+
+class RenderJobQueue:
+    def __init__(self, render_fn, max_workers=RENDER_WORKERS, max_pending=MAX_PENDING_RENDER_JOBS, job_ttl=RENDER_JOB_TTL):
+        """
+        Run video renders on a bounded worker pool and track their status.
+
+        render_fn is called with the submitted keyword arguments plus a
+        progress_callback(percent, stage) and must return the output path.
+        """
+        self.render_fn = render_fn
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='render-worker')
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, **render_kwargs):
+        """Queue a render and return its job ID without waiting for it"""
+        with self.lock:
+            self._prune_finished_jobs()
+
+            pending = sum(1 for job in self.jobs.values() if job['status'] in ('queued', 'running'))
+            if pending >= self.max_pending:
+                raise RenderQueueFull(f"{pending} render jobs are already pending, try again later")
+
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'queued',
+                'stage': 'waiting for a render worker',
+                'progress': 0,
+                'output_path': None,
+                'error': None,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None
+            }
+
+        self.executor.submit(self._run_job, job_id, render_kwargs)
+        print(f"Queued render job {job_id} ({pending + 1} pending)")
+        return job_id
+
+    def get_job(self, job_id):
+        """Return a snapshot of the job state, or None for unknown IDs"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _run_job(self, job_id, render_kwargs):
+        """Worker body: run the render and record the outcome"""
+        self._update_job(job_id, status='running', stage='starting', started_at=time.time())
+
+        def report_progress(percent, stage=None):
+            updates = {'progress': max(0, min(99, int(percent)))}
+            if stage:
+                updates['stage'] = stage
+            self._update_job(job_id, **updates)
+
+        try:
+            output_path = self.render_fn(progress_callback=report_progress, **render_kwargs)
+            self._update_job(
+                job_id,
+                status='completed',
+                stage='done',
+                progress=100,
+                output_path=output_path,
+                finished_at=time.time()
+            )
+            print(f"Render job {job_id} completed: {output_path}")
+        except Exception as e:
+            print(f"Render job {job_id} failed: {str(e)}")
+            traceback.print_exc()
+            self._update_job(job_id, status='failed', stage='failed', error=str(e), finished_at=time.time())
+
+    def _update_job(self, job_id, **updates):
+        with self.lock:
+            if job_id in self.jobs:
+                self.jobs[job_id].update(updates)
+
+    def _prune_finished_jobs(self):
+        """Forget finished jobs older than the TTL (caller holds the lock)"""
+        cutoff = time.time() - self.job_ttl
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job['finished_at'] is not None and job['finished_at'] < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
@@ -0,0 +1,495 @@
+import os
+import uuid
+import numpy as np
+from datetime import datetime
+from moviepy import ImageClip, CompositeVideoClip, concatenate_videoclips, vfx, afx
+from proglog import ProgressBarLogger
+from config import *
+from services.motion_engine import MotionEngine
+from services.content_hash import resolve_photo_path
+from services.photo_metadata import photo_metadata_index
+from services.frame_cache import frame_cache
+from services.preprocess import photo_preprocessor
+from services.ffmpeg_renderer import FFmpegSlideshowRenderer
+from services.timeline import Timeline
+from services.stem_cache import stem_cache
+
+# Synthesised background music recipes (see services.audio_synth.synthesize_recipe),
+# rendered once to loopable stems by services.stem_cache
+CINEMATIC_MUSIC_RECIPES = {
+    'nostalgic': {
+        'voices': [(220, 0.3), (277, 0.25), (330, 0.2), (392, 0.15)],  # A3 C#4 E4 G4
+        'pulse': (0.5, 0.1)  # Reverb-like swell
+    },
+    'upbeat': {
+        'voices': [(440, 0.3), (554, 0.25), (659, 0.2), (784, 0.15)],  # A4 C#5 E5 G5
+        'tempo': 1.5,
+        'pulse': (3, 0.1)  # Rhythm
+    },
+    'romantic': {
+        'voices': [(392, 0.3), (494, 0.25), (587, 0.2), (659, 0.15)],  # G4 B4 D5 E5
+        'envelope': ('attack', 0.2, 2, 0.6)  # Soft attack
+    },
+    'energetic': {
+        'voices': [(523, 0.3), (659, 0.25), (784, 0.2), (880, 0.15)],  # C5 E5 G5 A5
+        'tempo': 2.0,
+        'pulse': (6, 0.1)  # Percussion
+    },
+    'calm': {
+        'voices': [(220, 0.3), (277, 0.25), (330, 0.2), (392, 0.15)],  # A3 C#4 E4 G4
+        'tempo': 0.4
+    }
+}
+
+
+class RenderProgressLogger(ProgressBarLogger):
+    """Forward MoviePy's frame counter to a progress callback"""
+
+    def __init__(self, progress_callback, start=60, end=99):
+        super().__init__()
+        self.progress_callback = progress_callback
+        self.start = start
+        self.end = end
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if bar == 'frame_index' and attr == 'index':
+            total = self.bars[bar].get('total') or 1
+            self.progress_callback(self.start + (self.end - self.start) * value / total, 'encoding video')
+
+
+class RenderPipeline:
+    """
+    Shared photo-to-video render pipeline.
+
+    Output styles are presets: subclasses set the class attributes below and
+    override _choose_effect/_choose_transition. Effects, transitions and
+    music styles are looked up by name in per-instance registries, so a
+    preset can add or replace entries with register_effect,
+    register_transition and register_music.
+
+    Effects and transitions built by the factories below also carry a
+    declarative `spec`, which lets the ffmpeg backend (RENDER_BACKEND=ffmpeg)
+    render the same vocabulary without building MoviePy clips.
+    """
+    output_prefix = 'memory_video'
+    style_name = 'video'
+    fps = 24
+    bitrate = None
+    default_duration = 3  # seconds per photo
+    default_music_style = 'nostalgic'
+    music_recipes = CINEMATIC_MUSIC_RECIPES
+    music_volume = 0.3
+    music_fade = 0  # seconds of audio fade in/out
+    crossfade_duration = 0  # overlap between neighbouring clips, 0 for straight cuts
+    fallback_color = (100, 100, 100)
+
+    def __init__(self):
+        self.output_folder = OUTPUT_FOLDER
+        self.motion_engine = MotionEngine()
+        self.frame_cache = frame_cache
+        self.preprocessor = photo_preprocessor
+        self.effects = {}
+        self.transitions = {}
+        self.music_styles = {}
+
+        self._register_effects()
+        self._register_transitions()
+        self._register_music()
+
+    def register_effect(self, name, effect_fn):
+        """Register effect_fn(clip) -> clip under name (see _motion_effect for ffmpeg support)"""
+        self.effects[name] = effect_fn
+
+    def register_transition(self, name, transition_fn):
+        """Register transition_fn(clip, index, total_clips) -> clip under name (see _spec_transition for ffmpeg support)"""
+        self.transitions[name] = transition_fn
+
+    def register_music(self, name, music_fn):
+        """Register music_fn(duration) -> AudioClip under name"""
+        self.music_styles[name] = music_fn
+
+    def create_video(self, photo_paths, context, video_plan, progress_callback=None):
+        """
+        Create a video from photos using this preset's effects, transitions and music
+
+        progress_callback(percent, stage) is called as the render advances.
+        """
+        def report(percent, stage):
+            if progress_callback:
+                progress_callback(percent, stage)
+
+        mapped_frames = None
+        try:
+            print(f"Creating {self.style_name} video with {len(photo_paths)} photos")
+            print(f"Photo paths: {photo_paths}")
+
+            # Get video plan parameters
+            sequence = video_plan.get('sequence', list(range(len(photo_paths))))
+            duration_per_photo = video_plan.get('duration_per_photo', self.default_duration)
+            music_style = video_plan.get('music_style', self.default_music_style)
+
+            print(f"Video plan: sequence={sequence}, duration={duration_per_photo}, music={music_style}")
+
+            # Read every photo header in parallel up front; clip creation hits the cache
+            photo_metadata_index.get_many(photo_paths)
+
+            # Decode and letterbox the photos on the preprocessing pool; clips then map the cached frames
+            self._preprocess_frames([photo_paths[idx] for idx in sequence if idx < len(photo_paths)])
+
+            if FRAME_STORE_MEMMAP:
+                mapped_frames = self._map_frames([photo_paths[idx] for idx in sequence if idx < len(photo_paths)])
+
+            if RENDER_BACKEND == 'ffmpeg':
+                return self._render_with_ffmpeg(photo_paths, sequence, duration_per_photo, music_style, video_plan, mapped_frames, report)
+
+            # Create clips from photos
+            clips = []
+            total_photos = len(sequence)
+            for i, photo_idx in enumerate(sequence):
+                if photo_idx < len(photo_paths):
+                    photo_path = photo_paths[photo_idx]
+                    print(f"Processing photo {i+1}/{total_photos}: {photo_path}")
+
+                    effect = self._choose_effect(i, total_photos, video_plan)
+                    clip = self._create_photo_clip(photo_path, duration_per_photo, effect, mapped_frames)
+
+                    transition = self._choose_transition(i, total_photos, video_plan)
+                    if transition:
+                        clip = self._apply_transition(clip, transition, i, total_photos)
+
+                    clips.append(clip)
+                    print(f"Created clip {i+1} with duration {clip.duration}, effect: {effect}, transition: {transition}")
+                    report(5 + 45 * (i + 1) / total_photos, 'preparing photos')
+
+            if not clips:
+                raise Exception("No valid clips were created")
+            print(f"Frame cache: {self.frame_cache.stats()}")
+
+            print(f"Concatenating {len(clips)} clips...")
+            report(50, 'assembling timeline')
+            final_video = self._concatenate(clips)
+            print(f"Final video duration: {final_video.duration}")
+
+            report(55, 'adding music')
+            final_video = self._add_background_music(final_video, music_style)
+
+            output_path, render_id = self._output_path()
+            temp_audiofile = os.path.join(self.output_folder, f"temp-audio-{render_id}.m4a")
+
+            print(f"Writing {self.style_name} video to: {output_path}")
+            report(60, 'encoding video')
+            write_options = {
+                'fps': self.fps,
+                'codec': 'libx264',
+                'audio_codec': 'aac',
+                'temp_audiofile': temp_audiofile,
+                'remove_temp': True,
+                'logger': RenderProgressLogger(progress_callback) if progress_callback else 'bar'
+            }
+            if self.bitrate:
+                write_options['bitrate'] = self.bitrate
+            final_video.write_videofile(output_path, **write_options)
+
+            print(f"{self.style_name.capitalize()} video created successfully: {output_path}")
+
+            # Clean up
+            final_video.close()
+            for clip in clips:
+                clip.close()
+
+            return output_path
+
+        except Exception as e:
+            print(f"Error creating {self.style_name} video: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            raise e
+
+    def _render_with_ffmpeg(self, photo_paths, sequence, duration_per_photo, music_style, video_plan, mapped_frames, report):
+        """Render the same plan by piping NumPy frames straight to ffmpeg"""
+        timeline = Timeline(self.crossfade_duration)
+        total_photos = len(sequence)
+        for i, photo_idx in enumerate(sequence):
+            if photo_idx < len(photo_paths):
+                photo_path = photo_paths[photo_idx]
+                print(f"Processing photo {i+1}/{total_photos}: {photo_path}")
+
+                effect = self._choose_effect(i, total_photos, video_plan)
+                transition = self._choose_transition(i, total_photos, video_plan)
+                timeline.add({
+                    'frame': self._load_frame(photo_path, mapped_frames),
+                    'motion': self._effect_spec(effect),
+                    'transition': self._transition_spec(transition, i, total_photos) if transition else None
+                }, duration_per_photo)
+                print(f"Planned shot {i+1}, effect: {effect}, transition: {transition}")
+                report(5 + 45 * (i + 1) / total_photos, 'preparing photos')
+
+        if not timeline:
+            raise Exception("No valid clips were created")
+        print(f"Frame cache: {self.frame_cache.stats()}")
+
+        # Shots carry their placement: start, duration and crossfade from the previous shot
+        shots = [dict(entry['item'], start=entry['start'], duration=entry['duration'], crossfade=entry['crossfade']) for entry in timeline]
+        report(55, 'adding music')
+        try:
+            print(f"Adding {music_style} background music...")
+            music = self._create_music(music_style, timeline.duration)
+        except Exception as e:
+            print(f"Error adding background music: {str(e)}")
+            # Render without audio if music fails, like the MoviePy path
+            music = None
+
+        output_path, _ = self._output_path()
+        print(f"Writing {self.style_name} video to: {output_path} (ffmpeg pipe)")
+        report(60, 'encoding video')
+        renderer = FFmpegSlideshowRenderer(
+            size=(DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT),
+            fps=self.fps,
+            bitrate=self.bitrate,
+            segment_workers=RENDER_SEGMENT_WORKERS,
+            motion_engine=self.motion_engine
+        )
+        renderer.render(shots, output_path, audio=music, progress_callback=lambda fraction: report(60 + 39 * fraction, 'encoding video'))
+
+        print(f"{self.style_name.capitalize()} video created successfully: {output_path}")
+        return output_path
+
+    def _output_path(self):
+        """Output file path and render ID (unique per render so concurrent jobs don't collide)"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        render_id = uuid.uuid4().hex[:8]
+        output_filename = f"{self.output_prefix}_{timestamp}_{render_id}.mp4"
+        return os.path.join(self.output_folder, output_filename), render_id
+
+    def _choose_effect(self, index, total_photos, video_plan):
+        """Pick the effect name for a photo; presets override this"""
+        return 'static'
+
+    def _choose_transition(self, index, total_photos, video_plan):
+        """Pick the transition name for a photo, or None for a hard cut"""
+        return None
+
+    def _preprocess_frames(self, photos):
+        """Write the normalized frame of each distinct photo to the frame cache in parallel"""
+        try:
+            self.preprocessor.run(list(dict.fromkeys(photos)))
+            self.frame_cache.prune_disk()
+        except Exception as e:
+            # _load_frame decodes any photo that is still missing
+            print(f"Error preprocessing photos: {str(e)}")
+
+    def _map_frames(self, photos):
+        """Memory-map each distinct photo's cached .npy frame for this render, bypassing the in-memory tier"""
+        mapped_frames = {}
+        for photo in dict.fromkeys(photos):
+            try:
+                mapped_frames[photo] = self.frame_cache.get_frame(photo, (DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT), remember=False)
+            except Exception as e:
+                # Clip creation falls back to the frame cache for this photo
+                print(f"Error mapping frame for {photo}: {str(e)}")
+        print(f"Memory-mapped {len(mapped_frames)} frames from {self.frame_cache.cache_folder}")
+        return mapped_frames
+
+    def _load_frame(self, photo, mapped_frames=None):
+        """Normalized frame for a photo (blob ID or path), or a fallback colour frame when it can't be used"""
+        photo_path = resolve_photo_path(photo)
+        try:
+            # Verify file exists
+            if not os.path.exists(photo_path):
+                print(f"File does not exist: {photo_path}")
+                return self._create_fallback_frame()
+
+            # Verify the image from its indexed header instead of reopening it
+            metadata = photo_metadata_index.get(photo)
+            if not metadata or metadata['width'] == 0 or metadata['height'] == 0:
+                print("Invalid image dimensions")
+                return self._create_fallback_frame()
+            print(f"Image size: {metadata['width']}x{metadata['height']}, format: {metadata['format']}")
+
+            # The normalized frame is decoded, fitted and letterboxed once,
+            # then shared with every later render
+            frame = mapped_frames.get(photo) if mapped_frames else None
+            if frame is None:
+                frame = self.frame_cache.get_frame(photo, (DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT))
+            return frame
+
+        except Exception as e:
+            print(f"Error loading frame from {photo_path}: {str(e)}")
+            return self._create_fallback_frame()
+
+    def _create_photo_clip(self, photo, duration, effect, mapped_frames=None):
+        """Create a video clip from a photo (blob ID or path) with the named effect applied"""
+        print(f"Creating clip from: {photo} with effect: {effect}")
+        clip = ImageClip(self._load_frame(photo, mapped_frames), duration=duration)
+        print(f"Frame clip size: {clip.size}")
+        return self._apply_effect(clip, effect)
+
+    def _create_fallback_frame(self):
+        """Solid frame used when image processing fails"""
+        return np.full((DEFAULT_VIDEO_HEIGHT, DEFAULT_VIDEO_WIDTH, 3), self.fallback_color, dtype=np.uint8)
+
+    def _effect_spec(self, effect):
+        """Motion spec of a registered effect; effects without one render static"""
+        spec = getattr(self.effects.get(effect), 'spec', None)
+        if spec is None:
+            print(f"Effect {effect} has no motion spec, leaving photo static")
+            return ('static',)
+        return spec
+
+    def _transition_spec(self, transition, index, total_clips):
+        """Transition spec for a clip, falling back to a plain fade like _apply_transition"""
+        transition_fn = self.transitions.get(transition, self.transitions.get('fade'))
+        spec_fn = getattr(transition_fn, 'spec', None)
+        if spec_fn is None:
+            print(f"Transition {transition} has no spec, using a hard cut")
+            return None
+        return spec_fn(index, total_clips)
+
+    def _apply_effect(self, clip, effect):
+        """Apply a registered effect to the clip"""
+        effect_fn = self.effects.get(effect)
+        if effect_fn is None:
+            print(f"Unknown effect {effect}, leaving photo static")
+            return clip
+        try:
+            return effect_fn(clip)
+        except Exception as e:
+            print(f"Error applying effect {effect}: {str(e)}")
+            return clip
+
+    def _apply_transition(self, clip, transition, index, total_clips):
+        """Apply a registered transition, falling back to a plain fade"""
+        transition_fn = self.transitions.get(transition, self.transitions.get('fade'))
+        if transition_fn is None:
+            return clip
+        try:
+            return transition_fn(clip, index, total_clips)
+        except Exception as e:
+            print(f"Error applying transition {transition}: {str(e)}")
+            return clip
+
+    def _concatenate(self, clips):
+        """Join the clips, crossfading neighbours when the preset asks for it"""
+        if self.crossfade_duration and len(clips) > 1:
+            return self._concatenate_with_crossfades(clips)
+        return concatenate_videoclips(clips, method="compose")
+
+    def _concatenate_with_crossfades(self, clips):
+        """Place clips on one timeline so neighbours only overlap (and blend) during the crossfade"""
+        try:
+            timeline = Timeline(self.crossfade_duration)
+            for clip in clips:
+                timeline.add(clip, clip.duration)
+
+            layers = []
+            for entry in timeline:
+                clip = entry['item'].with_start(entry['start'])
+                if entry['crossfade']:
+                    clip = clip.with_effects([vfx.CrossFadeIn(entry['crossfade'])])
+                layers.append(clip)
+
+            # Outside the crossfade windows only one layer is playing, so only one frame is rendered
+            return CompositeVideoClip(layers, size=(DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT)).with_duration(timeline.duration)
+        except Exception as e:
+            print(f"Error concatenating with crossfades: {str(e)}")
+            return concatenate_videoclips(clips, method="compose")
+
+    def _add_background_music(self, video, music_style):
+        """Add background music to video"""
+        try:
+            print(f"Adding {music_style} background music...")
+
+            return video.with_audio(self._create_music(music_style, video.duration))
+        except Exception as e:
+            print(f"Error adding background music: {str(e)}")
+            # Return video without audio if music fails
+            return video
+
+    def _create_music(self, music_style, duration):
+        """Background music at the preset's volume and fades"""
+        music_fn = self.music_styles.get(music_style) or self.music_styles[self.default_music_style]
+        music = music_fn(duration)
+        music = music.with_volume_scaled(self.music_volume)
+
+        if self.music_fade:
+            music = music.with_effects([afx.AudioFadeIn(self.music_fade), afx.AudioFadeOut(self.music_fade)])
+        return music
+
+    def _register_effects(self):
+        """Register the built-in motion effects"""
+        self.register_effect('static', self._motion_effect(('static',)))
+        self.register_effect('ken_burns_zoom_in', self._zoom_effect(1.0, 1.2))
+        self.register_effect('ken_burns_zoom_out', self._zoom_effect(1.2, 1.0))
+        self.register_effect('ken_burns_pan_left', self._pan_effect('left'))
+        self.register_effect('ken_burns_pan_right', self._pan_effect('right'))
+        self.register_effect('zoom_in', self._zoom_effect(1.0, 1.2))
+        self.register_effect('zoom_out', self._zoom_effect(1.2, 1.0))
+        self.register_effect('pan_left', self._pan_effect('left'))
+        self.register_effect('pan_right', self._pan_effect('right'))
+        self.register_effect('zoom_in_center', self._zoom_effect(1.0, 1.3))
+        self.register_effect('zoom_out_center', self._zoom_effect(1.3, 1.0))
+
+    def _register_transitions(self):
+        """Register the built-in fade and slide transitions"""
+        self.register_transition('fade_in', self._fade_transition(1.0, 0))
+        self.register_transition('fade_out', self._fade_transition(0, 1.0))
+        self.register_transition('crossfade', self._fade_transition(0.5, 0.5))
+        self.register_transition('zoom_transition', self._fade_transition(0.5, 0.5))
+        self.register_transition('dissolve', self._fade_transition(1.0, 1.0))
+        self.register_transition('fade', self._fade_transition(0.5, 0.5))
+        self.register_transition('slide_left', self._slide_transition(100, 0.3))
+        self.register_transition('slide_right', self._slide_transition(-100, 0.3))
+
+    def _register_music(self):
+        """Register a synthesised track for every recipe of this preset"""
+        for style, recipe in self.music_recipes.items():
+            self.register_music(style, self._recipe_music(recipe))
+
+    def _motion_effect(self, motion):
+        """Effect for a MotionEngine.motion_rects spec"""
+        def effect(clip):
+            if motion[0] == 'static':
+                return clip
+            return self.motion_engine.move(clip.get_frame(0), clip.duration, motion)
+        effect.spec = motion
+        return effect
+
+    def _zoom_effect(self, start_zoom, end_zoom, start_center=(0.5, 0.5), end_center=None):
+        return self._motion_effect(('zoom', start_zoom, end_zoom, start_center, end_center or start_center))
+
+    def _pan_effect(self, direction, amount=0.15):
+        return self._motion_effect(('pan', direction, amount))
+
+    def _spec_transition(self, spec_fn):
+        """
+        Transition driven by spec_fn(index, total_clips), which returns
+        ('fade', fade_in, fade_out) or ('slide', pixels_per_second, fade)
+        """
+        def transition(clip, index, total_clips):
+            kind, *params = spec_fn(index, total_clips)
+            if kind == 'slide':
+                speed, fade = params
+                clip = clip.with_position(lambda t: (t * speed, 0))
+                fade_in = fade_out = fade
+            else:
+                fade_in, fade_out = params
+
+            effects = []
+            if fade_in:
+                effects.append(vfx.FadeIn(fade_in))
+            if fade_out:
+                effects.append(vfx.FadeOut(fade_out))
+            return clip.with_effects(effects) if effects else clip
+        transition.spec = spec_fn
+        return transition
+
+    def _fade_transition(self, fade_in, fade_out):
+        return self._spec_transition(lambda index, total_clips: ('fade', fade_in, fade_out))
+
+    def _slide_transition(self, speed, fade):
+        return self._spec_transition(lambda index, total_clips: ('slide', speed, fade))
+
+    def _recipe_music(self, recipe):
+        def music(duration):
+            return stem_cache.clip(recipe, duration)
+        return music
@@ -0,0 +1,127 @@
+import os
+import json
+import uuid
+import wave
+import hashlib
+import threading
+import numpy as np
+from moviepy.audio.AudioClip import AudioArrayClip
+from services.audio_synth import audio_synthesizer
+from config import STEM_FOLDER, STEM_SECONDS, STEM_LOOP_CROSSFADE
+
+
+class StemCache:
+    def __init__(self, folder=STEM_FOLDER, stem_seconds=STEM_SECONDS, loop_crossfade=STEM_LOOP_CROSSFADE, synthesizer=audio_synthesizer):
+        """
+        Loopable soundtrack stems, rendered once per recipe and kept on disk.
+
+        A stem is an intro of stem_seconds followed by a loop of the same
+        length. The loop's last loop_crossfade seconds are blended (equal
+        power) with the audio just before the loop start, so it wraps
+        around without a click, and the intro leads straight into it. Any
+        duration is then a trim of the intro plus whole or partial loops:
+        a memory copy instead of another synthesis pass.
+        """
+        self.folder = folder
+        self.stem_seconds = stem_seconds
+        self.loop_crossfade = loop_crossfade
+        self.synthesizer = synthesizer
+        self.sample_rate = synthesizer.sample_rate
+        self.stems = {}
+        self.lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def clip(self, recipe, duration, fade=0):
+        """AudioArrayClip of the recipe for duration seconds"""
+        return AudioArrayClip(self.track(recipe, duration, fade), fps=self.sample_rate)
+
+    def track(self, recipe, duration, fade=0):
+        """(samples, 2) float32 stereo track: intro, then the loop repeated, with optional fade in/out"""
+        stem = self.stem(recipe)
+        intro = len(stem) // 2
+        loop = stem[intro:]
+        total = max(1, int(round(duration * self.sample_rate)))
+
+        # Always two channels (mono stems are broadcast): MoviePy 2 audio clips render stereo frames
+        track = np.empty((total, 2), dtype=np.float32)
+        head = min(total, intro)
+        track[:head] = stem[:head]
+        for start in range(intro, total, len(loop)):
+            end = min(start + len(loop), total)
+            track[start:end] = loop[:end - start]
+
+        fade_samples = min(int(round(fade * self.sample_rate)), total // 2)
+        if fade_samples:
+            ramp = np.linspace(0.0, 1.0, fade_samples, dtype=np.float32)[:, None]
+            track[:fade_samples] *= ramp
+            track[total - fade_samples:] *= ramp[::-1]
+        return track
+
+    def stem(self, recipe):
+        """Read-only stem for a recipe, from memory, disk, or synthesised and saved"""
+        key = self._key(recipe)
+        with self.lock:
+            stem = self.stems.get(key)
+        if stem is not None:
+            return stem
+
+        path = os.path.join(self.folder, f"{key}.wav")
+        stem = None
+        if os.path.exists(path):
+            try:
+                stem = self._read_wav(path)
+            except Exception as e:
+                print(f"Error reading stem {path}, rebuilding: {str(e)}")
+        if stem is None:
+            stem = self._build(recipe)
+            self._write_wav(path, stem)
+
+        stem.setflags(write=False)
+        with self.lock:
+            self.stems[key] = stem
+        return stem
+
+    def _key(self, recipe):
+        description = json.dumps([recipe, self.sample_rate, self.stem_seconds, self.loop_crossfade], sort_keys=True)
+        return hashlib.sha256(description.encode()).hexdigest()[:16]
+
+    def _build(self, recipe):
+        """Synthesise intro + loop and blend the loop's tail into the audio before its start"""
+        length = int(round(self.stem_seconds * self.sample_rate))
+        crossfade = min(int(round(self.loop_crossfade * self.sample_rate)), length)
+        stem = np.array(self.synthesizer.render(recipe, 2 * length / self.sample_rate)[:2 * length], dtype=np.float32)
+
+        if crossfade:
+            # After the last loop sample comes loop[0] == audio[length], so the
+            # tail fades into the audio that precedes audio[length]
+            angle = np.linspace(0.0, np.pi / 2, crossfade, dtype=np.float32)[:, None]
+            tail = stem[2 * length - crossfade:2 * length]
+            lead = stem[length - crossfade:length]
+            stem[2 * length - crossfade:2 * length] = tail * np.cos(angle) + lead * np.sin(angle)
+        # Same range as the 16-bit file it is saved to
+        return np.clip(stem, -1.0, 1.0)
+
+    def _read_wav(self, path):
+        with wave.open(path, 'rb') as f:
+            channels = f.getnchannels()
+            if f.getframerate() != self.sample_rate or f.getsampwidth() != 2:
+                raise ValueError("unexpected stem format")
+            samples = np.frombuffer(f.readframes(f.getnframes()), dtype='<i2')
+        return (samples.reshape(-1, channels) / 32767.0).astype(np.float32)
+
+    def _write_wav(self, path, stem):
+        """Save as 16-bit PCM, atomically"""
+        try:
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            samples = (np.clip(stem, -1.0, 1.0) * 32767).astype('<i2')
+            with wave.open(temp_path, 'wb') as f:
+                f.setnchannels(stem.shape[1])
+                f.setsampwidth(2)
+                f.setframerate(self.sample_rate)
+                f.writeframes(samples.tobytes())
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Error caching stem {path}: {str(e)}")
+
+
+stem_cache = StemCache()
@@ -0,0 +1,40 @@
+class Timeline:
+    def __init__(self, transition_duration=0):
+        """
+        Sequential layout of clips with explicit start times.
+
+        Each clip after the first starts transition_duration before its
+        predecessor ends, so neighbours only overlap during the transition
+        window. The overlap is capped at half of either neighbour's duration,
+        which keeps at most two sources on screen at any time.
+        """
+        self.transition_duration = transition_duration
+        self.entries = []
+
+    def add(self, item, duration):
+        """Place item after the last entry and return its entry dict (item, start, duration, crossfade)"""
+        start = 0.0
+        crossfade = 0.0
+        if self.entries:
+            previous = self.entries[-1]
+            crossfade = max(0.0, min(self.transition_duration, previous['duration'] / 2, duration / 2))
+            start = previous['start'] + previous['duration'] - crossfade
+
+        entry = {'item': item, 'start': start, 'duration': duration, 'crossfade': crossfade}
+        self.entries.append(entry)
+        return entry
+
+    @property
+    def duration(self):
+        """Total length; each overlap is counted once"""
+        return max((entry['start'] + entry['duration'] for entry in self.entries), default=0.0)
+
+    def active(self, t):
+        """Entries on screen at time t, earliest first"""
+        return [entry for entry in self.entries if entry['start'] <= t < entry['start'] + entry['duration']]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
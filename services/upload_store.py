@@ -0,0 +1,178 @@
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+from services.photo_metadata import read_image_metadata, FORMAT_EXTENSIONS
+from services.content_hash import is_blob_id
+from config import UPLOAD_FOLDER, UPLOAD_HEADER_BYTES
+
+SESSION_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class IngestStream:
+    """
+    Writable stream handed to Werkzeug's multipart parser for one file part.
+
+    Chunks go straight to a temp file in the store while the SHA-256 is
+    updated, and the first header_bytes are kept in memory so metadata can
+    be read without reopening the file. Memory use is bounded by that prefix.
+    """
+
+    def __init__(self, temp_path, filename, header_bytes):
+        self.temp_path = temp_path
+        self.filename = filename
+        self.header_bytes = header_bytes
+        self.hasher = hashlib.sha256()
+        self.header = bytearray()
+        self.size = 0
+        self.committed = False
+        self.file = open(temp_path, 'w+b')
+
+    def write(self, data):
+        self.hasher.update(data)
+        if len(self.header) < self.header_bytes:
+            self.header.extend(data[:self.header_bytes - len(self.header)])
+        self.size += len(data)
+        return self.file.write(data)
+
+    def close(self):
+        """Close the temp file, deleting it unless the store took ownership"""
+        if not self.file.closed:
+            self.file.close()
+        if not self.committed and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def __getattr__(self, name):
+        # seek/read/tell etc. for FileStorage and the parser
+        return getattr(self.file, name)
+
+
+class UploadStore:
+    def __init__(self, root=UPLOAD_FOLDER, header_bytes=UPLOAD_HEADER_BYTES):
+        """
+        Content-addressed photo store.
+
+        Each photo is kept once under blobs/<sha256>.<ext> with a JSON
+        metadata sidecar next to it, so identical uploads share one file.
+        sessions/<id>.json records the original file names of each upload.
+        """
+        self.root = root
+        self.header_bytes = header_bytes
+        self.blob_folder = os.path.join(root, 'blobs')
+        self.temp_folder = os.path.join(root, 'tmp')
+        self.session_folder = os.path.join(root, 'sessions')
+        os.makedirs(self.blob_folder, exist_ok=True)
+        os.makedirs(self.temp_folder, exist_ok=True)
+        os.makedirs(self.session_folder, exist_ok=True)
+
+    def open_stream(self, filename=None):
+        """Start receiving one uploaded file"""
+        temp_path = os.path.join(self.temp_folder, f"{uuid.uuid4().hex}.part")
+        return IngestStream(temp_path, filename, self.header_bytes)
+
+    def commit(self, stream):
+        """
+        Finish an upload: move it into the store (or drop it if the blob
+        already exists) and return its metadata. Raises ValueError if the
+        file is not a supported image.
+        """
+        stream.file.flush()
+        content_hash = stream.hasher.hexdigest()
+
+        try:
+            metadata = read_image_metadata(bytes(stream.header))
+        except Exception:
+            # EXIF bigger than the header prefix; PIL still only reads the header
+            try:
+                stream.file.seek(0)
+                metadata = read_image_metadata(stream.file)
+            except Exception as e:
+                raise ValueError(f"{stream.filename} is not a readable image: {str(e)}")
+
+        extension = FORMAT_EXTENSIONS.get(metadata['format'])
+        if not extension:
+            raise ValueError(f"{stream.filename} has unsupported image format {metadata['format']}")
+
+        blob_id = f"{content_hash}.{extension}"
+        blob_path = self.blob_path(blob_id)
+        if os.path.exists(blob_path):
+            # Duplicate content: keep the stored copy, the temp file is removed on close
+            stream.close()
+            existing = self.get_metadata(blob_id)
+            if existing:
+                existing['duplicate'] = True
+                return existing
+        else:
+            stream.file.close()
+            os.replace(stream.temp_path, blob_path)
+            stream.committed = True
+
+        record = {
+            'blob_id': blob_id,
+            'content_hash': content_hash,
+            'original_name': stream.filename,
+            'size_bytes': stream.size,
+            'format': metadata['format'],
+            'width': metadata['width'],
+            'height': metadata['height'],
+            'oriented_size': list(metadata['oriented_size']),
+            'orientation': metadata['orientation'],
+            'datetime_original': metadata['datetime_original'],
+            'gps': metadata['gps'],
+            'uploaded_at': time.time()
+        }
+        with open(self._sidecar_path(blob_id), 'w') as f:
+            json.dump(record, f, indent=2)
+
+        record['duplicate'] = False
+        return record
+
+    def blob_path(self, blob_id):
+        if not is_blob_id(blob_id):
+            raise ValueError(f"Invalid blob ID: {blob_id!r}")
+        return os.path.join(self.blob_folder, blob_id)
+
+    def create_session(self, photos):
+        """Record which original file names an upload session mapped to which blobs"""
+        session_id = uuid.uuid4().hex
+        manifest = {
+            'session_id': session_id,
+            'created_at': time.time(),
+            'photos': [
+                {'original_name': photo['original_name'], 'blob_id': photo['blob_id']}
+                for photo in photos
+            ]
+        }
+        temp_path = os.path.join(self.temp_folder, f"session-{session_id}.json")
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, self._session_path(session_id))
+        return session_id
+
+    def get_session(self, session_id):
+        """Return a session manifest, or None for unknown or malformed session IDs"""
+        if not isinstance(session_id, str) or not SESSION_ID_PATTERN.match(session_id):
+            return None
+        try:
+            with open(self._session_path(session_id), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_metadata(self, blob_id):
+        """Return the stored sidecar metadata, or None if it is missing"""
+        if not is_blob_id(blob_id):
+            return None
+        try:
+            with open(self._sidecar_path(blob_id), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _session_path(self, session_id):
+        return os.path.join(self.session_folder, f"{session_id}.json")
+
+    def _sidecar_path(self, blob_id):
+        return os.path.join(self.blob_folder, f"{os.path.splitext(blob_id)[0]}.json")
@@ -4,32 +4,68 @@ Vector-based RAG database with FAISS for semantic retrieval
 """
 
 import os
+import re
 import json
+import uuid
+import hashlib
 import numpy as np
 import faiss
-from typing import List, Dict, Any, Tuple
-import pickle
-from sentence_transformers import SentenceTransformer
+from typing import List, Dict, Any
+from services.model_registry import model_registry
+from services.query_embedding_cache import QueryEmbeddingCache, normalize_query
+from config import RAG_INDEX_FOLDER
+
+# Bump when the searchable text or index layout changes so saved indexes rebuild
+RAG_INDEX_VERSION = 3
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+# Memory-maps the codes of flat indexes (faiss >= 1.9); IO_FLAG_MMAP only covers IVF inverted lists
+FAISS_MMAP_FLAG = getattr(faiss, 'IO_FLAG_MMAP_IFC', None)
 
 class VectorRAGDatabase:
-    def __init__(self, database_path: str = "rag_database.json", embeddings_path: str = "embeddings.pkl"):
-        """Initialize vector RAG database with FAISS"""
+    def __init__(self, database_path: str = "rag_database.json", index_folder: str = RAG_INDEX_FOLDER,
+                 query_cache: QueryEmbeddingCache = None):
+        """
+        Initialize vector RAG database with FAISS
+
+        Each category (effects, transitions, music, templates) has its own
+        index, so a category-filtered search only touches that category and
+        returns k real results. Indexes are saved with faiss.write_index
+        next to a JSON lines metadata sidecar and a manifest recording the
+        index version and the SHA-256 of the database. When both match,
+        startup opens the saved indexes instead of re-embedding, memory-
+        mapping their vectors where faiss supports it for flat indexes so
+        processes share the pages. When only the database changed, the
+        saved indexes are updated in place: items have stable IDs and a hash
+        of their searchable text, so just new or edited items are embedded
+        and removed ones are dropped with remove_ids. Query embeddings go through an LRU
+        keyed on the normalized query text, so repeated contexts skip the
+        encoder.
+        """
         self.database_path = database_path
-        self.embeddings_path = embeddings_path
+        self.index_folder = index_folder
+        self.metadata_path = os.path.join(index_folder, 'items.jsonl')
+        self.manifest_path = os.path.join(index_folder, 'manifest.json')
         
-        # Load sentence transformer for text embeddings
-        print("Loading sentence transformer for embeddings...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        
-        # Initialize FAISS index
         self.dimension = 384  # all-MiniLM-L6-v2 dimension
-        self.index = faiss.IndexFlatIP(self.dimension)  # Inner product for cosine similarity
+        self.indexes = {}  # category -> FAISS index
+        self.item_metadata = {}  # category -> {FAISS id: metadata row}
+        self.mapped = False  # memory-mapped indexes are read-only
+        self.query_cache = query_cache if query_cache is not None else QueryEmbeddingCache()
         
         # Load or create database
         self.database = self._load_database()
         self._build_or_load_index()
         
-        print(f"Vector RAG database initialized with {self.index.ntotal} items")
+        print(f"Vector RAG database initialized with {self.item_count} items in {len(self.indexes)} categories")
+
+    @property
+    def item_count(self) -> int:
+        return sum(index.ntotal for index in self.indexes.values())
+
+    @property
+    def embedding_model(self):
+        """Sentence transformer, loaded on first query or index build"""
+        return model_registry.get('sentence_embedder')
 
     def _load_database(self) -> Dict[str, Any]:
         """Load RAG database from JSON file"""
@@ -297,108 +333,274 @@ class VectorRAGDatabase:
         }
 
     def _build_or_load_index(self):
-        """Build or load FAISS index with embeddings"""
-        if os.path.exists(self.embeddings_path):
-            print("Loading existing embeddings...")
-            self._load_embeddings()
+        """Open the saved index if it matches this database, update it if only the database changed, else rebuild"""
+        database_hash = self._database_hash()
+        manifest = self._read_manifest()
+        if (manifest.get('version') == RAG_INDEX_VERSION
+                and manifest.get('model') == EMBEDDING_MODEL_NAME
+                and manifest.get('dimension') == self.dimension):
+            try:
+                if manifest.get('database_sha256') == database_hash:
+                    print("Loading existing embeddings index...")
+                    self._load_index()
+                    return
+                print("Database changed, updating saved embeddings index...")
+                self._load_index(mmap=False)
+                self._reconcile()
+                self._save_index(database_hash)
+                return
+            except Exception as e:
+                print(f"Error loading saved index, rebuilding: {str(e)}")
+        elif manifest:
+            print("Saved embeddings index is stale, rebuilding...")
         else:
             print("Building new embeddings index...")
-            self._build_embeddings()
-
-    def _build_embeddings(self):
-        """Build embeddings for all RAG items"""
-        all_items = []
-        item_metadata = []
         
-        # Process all items from database
+        self.indexes = {}
+        self.item_metadata = {}
+        self.mapped = False
+        self._reconcile()
+        self._save_index(database_hash)
+
+    def _database_hash(self) -> str:
+        """SHA-256 of rag_database.json, or of the default database when the file is missing"""
+        if os.path.exists(self.database_path):
+            with open(self.database_path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        return hashlib.sha256(json.dumps(self.database, sort_keys=True).encode()).hexdigest()
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _searchable_text(item: Dict[str, Any]) -> str:
+        return f"{item.get('name', '')} {item.get('description', '')} {item.get('use_case', '')} {item.get('mood', '')} {' '.join(item.get('keywords', []))}"
+
+    @staticmethod
+    def _faiss_id(item_id: str) -> int:
+        """Stable non-negative 63-bit FAISS id for an item id"""
+        return int(hashlib.sha256(item_id.encode()).hexdigest()[:16], 16) & ((1 << 63) - 1)
+
+    def _database_rows(self) -> Dict[str, Dict[int, Dict[str, Any]]]:
+        """Metadata rows for every database item, by category and FAISS id"""
+        rows = {}
         for category, items in self.database.items():
+            rows[category] = {}
             for item in items:
-                # Create searchable text
-                searchable_text = f"{item.get('name', '')} {item.get('description', '')} {item.get('use_case', '')} {item.get('mood', '')} {' '.join(item.get('keywords', []))}"
+                # Stable id: the item's own id, else its name within the category
+                base_id = str(item.get('id') or f"{category}:{item.get('name', '')}")
+                item_id, copy = base_id, 1
+                while self._faiss_id(item_id) in rows[category]:
+                    copy += 1
+                    item_id = f"{base_id}#{copy}"
                 
-                all_items.append(searchable_text)
-                item_metadata.append({
+                searchable_text = self._searchable_text(item)
+                rows[category][self._faiss_id(item_id)] = {
+                    'id': item_id,
                     'category': category,
                     'item': item,
-                    'original_text': searchable_text
-                })
+                    'original_text': searchable_text,
+                    'text_sha256': hashlib.sha256(searchable_text.encode()).hexdigest()
+                }
+        return rows
+
+    def _reconcile(self):
+        """Bring the category indexes in line with the database, embedding only new or changed items"""
+        wanted = self._database_rows()
+        removed = 0
+        pending = []  # (category, FAISS id, row) to embed
         
-        # Generate embeddings
-        print(f"Generating embeddings for {len(all_items)} items...")
-        embeddings = self.embedding_model.encode(all_items, convert_to_tensor=True)
-        embeddings = embeddings.cpu().numpy()
+        for category in list(self.indexes):
+            if category not in wanted:
+                removed += self.indexes.pop(category).ntotal
+                del self.item_metadata[category]
+                try:
+                    os.remove(self._index_path(category))
+                except OSError:
+                    pass
         
-        # Normalize embeddings for cosine similarity
-        embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        for category, rows in wanted.items():
+            current = self.item_metadata.get(category, {})
+            stale = {faiss_id for faiss_id, row in current.items()
+                     if faiss_id not in rows or rows[faiss_id]['text_sha256'] != row['text_sha256']}
+            if stale:
+                self.indexes[category].remove_ids(np.array(sorted(stale), dtype='int64'))
+                removed += len(stale)
+            pending.extend((category, faiss_id, row) for faiss_id, row in rows.items()
+                           if faiss_id in stale or faiss_id not in current)
+            if category not in self.indexes:
+                # Inner product for cosine similarity, addressed by stable ids
+                self.indexes[category] = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+            # Unchanged items still pick up edits to fields outside the searchable text
+            self.item_metadata[category] = rows
+        
+        if pending:
+            print(f"Generating embeddings for {len(pending)} items...")
+            embeddings = self._encode([row['original_text'] for _, _, row in pending])
+            for category in dict.fromkeys(category for category, _, _ in pending):
+                rows = [i for i, (row_category, _, _) in enumerate(pending) if row_category == category]
+                ids = np.array([pending[i][1] for i in rows], dtype='int64')
+                self.indexes[category].add_with_ids(np.ascontiguousarray(embeddings[rows]), ids)
+        if pending or removed:
+            print(f"Embeddings index updated: {len(pending)} embedded, {removed} removed")
+
+    def add_item(self, category: str, item: Dict[str, Any]):
+        """Add (or, with an existing stable id, replace) an item, embedding only that item"""
+        item_id = str(item.get('id') or f"{category}:{item.get('name', '')}")
+        items = self.database.setdefault(category, [])
+        for position, existing in enumerate(items):
+            if str(existing.get('id') or f"{category}:{existing.get('name', '')}") == item_id:
+                items[position] = item
+                break
+        else:
+            items.append(item)
+        
+        temp_path = f"{self.database_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.database, f, indent=2)
+        os.replace(temp_path, self.database_path)
         
-        # Add to FAISS index
-        self.index.add(embeddings.astype('float32'))
+        if self.mapped:
+            self._load_index(mmap=False)
+        self._reconcile()
+        self._save_index(self._database_hash())
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Unit-length float32 embeddings, so inner product is cosine similarity"""
+        embeddings = self.embedding_model.encode(texts, convert_to_tensor=True)
+        embeddings = embeddings.cpu().numpy()
+        embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return np.ascontiguousarray(embeddings, dtype='float32')
+
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Query embeddings, encoding only the normalized queries missing from the cache"""
+        normalized = [normalize_query(query) for query in queries]
+        embeddings = {query: self.query_cache.get(EMBEDDING_MODEL_NAME, query) for query in dict.fromkeys(normalized)}
+        missing = [query for query, embedding in embeddings.items() if embedding is None]
+        if missing:
+            for query, embedding in zip(missing, self._encode(missing)):
+                self.query_cache.put(EMBEDDING_MODEL_NAME, query, embedding)
+                embeddings[query] = embedding
+        if not normalized:
+            return np.zeros((0, self.dimension), dtype='float32')
+        return np.ascontiguousarray([embeddings[query] for query in normalized], dtype='float32')
+
+    def _index_path(self, category: str) -> str:
+        return os.path.join(self.index_folder, f"{re.sub(r'[^A-Za-z0-9_-]', '_', category)}.faiss")
+
+    def _save_index(self, database_hash: str):
+        """Write category indexes, metadata sidecar and (last) manifest, each atomically"""
+        try:
+            os.makedirs(self.index_folder, exist_ok=True)
+            suffix = f".{uuid.uuid4().hex}.tmp"
+            
+            for category, index in self.indexes.items():
+                index_path = self._index_path(category)
+                faiss.write_index(index, index_path + suffix)
+                os.replace(index_path + suffix, index_path)
+            
+            with open(self.metadata_path + suffix, 'w') as f:
+                for rows in self.item_metadata.values():
+                    for metadata in rows.values():
+                        f.write(json.dumps(metadata) + "\n")
+            os.replace(self.metadata_path + suffix, self.metadata_path)
+            
+            with open(self.manifest_path + suffix, 'w') as f:
+                json.dump({
+                    'version': RAG_INDEX_VERSION,
+                    'model': EMBEDDING_MODEL_NAME,
+                    'dimension': self.dimension,
+                    'database_sha256': database_hash,
+                    'categories': {category: index.ntotal for category, index in self.indexes.items()}
+                }, f, indent=2)
+            os.replace(self.manifest_path + suffix, self.manifest_path)
+            print(f"Saved embeddings index to {self.index_folder}")
+        except Exception as e:
+            print(f"Error saving embeddings index: {str(e)}")
+
+    def _load_index(self, mmap: bool = True):
+        """Open the saved category indexes (memory-mapped unless they are about to be updated) and their metadata"""
+        item_metadata = {}
+        with open(self.metadata_path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    metadata = json.loads(line)
+                    item_metadata.setdefault(metadata['category'], {})[self._faiss_id(metadata['id'])] = metadata
         
-        # Save embeddings and metadata
-        self._save_embeddings(embeddings, item_metadata)
-
-    def _save_embeddings(self, embeddings: np.ndarray, metadata: List[Dict]):
-        """Save embeddings and metadata"""
-        with open(self.embeddings_path, 'wb') as f:
-            pickle.dump({
-                'embeddings': embeddings,
-                'metadata': metadata
-            }, f)
-        print(f"Saved embeddings to {self.embeddings_path}")
-
-    def _load_embeddings(self):
-        """Load existing embeddings"""
-        with open(self.embeddings_path, 'rb') as f:
-            data = pickle.load(f)
-            embeddings = data['embeddings']
-            self.item_metadata = data['metadata']
+        indexes = {}
+        for category, rows in item_metadata.items():
+            path = self._index_path(category)
+            indexes[category] = self._read_index(path) if mmap and FAISS_MMAP_FLAG is not None else faiss.read_index(path)
+            if len(rows) != indexes[category].ntotal:
+                raise ValueError(f"{len(rows)} metadata rows for {indexes[category].ntotal} {category} vectors")
         
-        # Add to FAISS index
-        self.index.add(embeddings.astype('float32'))
-        print(f"Loaded {len(embeddings)} embeddings")
+        self.indexes = indexes
+        self.item_metadata = item_metadata
+        self.mapped = mmap and FAISS_MMAP_FLAG is not None
+        print(f"Loaded {self.item_count} embeddings")
+
+    def _read_index(self, path: str):
+        try:
+            return faiss.read_index(path, FAISS_MMAP_FLAG)
+        except Exception as e:
+            print(f"Memory-mapped index load failed, reading it instead: {str(e)}")
+            return faiss.read_index(path)
 
     def semantic_search(self, query: str, k: int = 5, category_filter: str = None) -> List[Dict[str, Any]]:
-        """Perform semantic search using FAISS"""
+        """Perform semantic search using FAISS, within one category's index when filtered"""
         try:
             # Generate query embedding
-            query_embedding = self.embedding_model.encode([query], convert_to_tensor=True)
-            query_embedding = query_embedding.cpu().numpy()
-            query_embedding = query_embedding / np.linalg.norm(query_embedding, axis=1, keepdims=True)
-            
-            # Search in FAISS index
-            scores, indices = self.index.search(query_embedding.astype('float32'), k)
+            query_embedding = self._encode_queries([query])
             
+            categories = [category_filter] if category_filter else list(self.indexes)
             results = []
-            for score, idx in zip(scores[0], indices[0]):
-                if idx < len(self.item_metadata):
-                    metadata = self.item_metadata[idx]
-                    
-                    # Apply category filter if specified
-                    if category_filter and metadata['category'] != category_filter:
-                        continue
-                    
-                    results.append({
-                        'item': metadata['item'],
-                        'category': metadata['category'],
-                        'score': float(score),
-                        'original_text': metadata['original_text']
-                    })
+            for category in categories:
+                results.extend(self._search_category(category, query_embedding, k)[0])
             
-            return results
+            # Unfiltered searches merge each category's best hits
+            results.sort(key=lambda result: result['score'], reverse=True)
+            return results[:k]
             
         except Exception as e:
             print(f"Error in semantic search: {str(e)}")
             return []
 
+    def _search_category(self, category: str, query_embeddings: np.ndarray, k: int) -> List[List[Dict[str, Any]]]:
+        """Top min(k, category size) results of one category index for each query row"""
+        index = self.indexes.get(category)
+        if index is None or index.ntotal == 0 or k <= 0:
+            return [[] for _ in range(len(query_embeddings))]
+        
+        rows = self.item_metadata[category]
+        scores, indices = index.search(query_embeddings, min(k, index.ntotal))
+        return [
+            [{
+                'item': rows[int(idx)]['item'],
+                'category': category,
+                'score': float(score),
+                'original_text': rows[int(idx)]['original_text']
+            } for score, idx in zip(query_scores, query_indices) if int(idx) in rows]
+            for query_scores, query_indices in zip(scores, indices)
+        ]
+
+    @staticmethod
+    def _cycle(items: List[Dict], count: int) -> List[Dict]:
+        """Repeat the ranked items until there is one per photo"""
+        return [items[i % len(items)] for i in range(count)] if items else []
+
     def get_relevant_effects(self, context: str, photo_count: int) -> List[Dict]:
-        """Get relevant effects using semantic search"""
+        """Get relevant effects using semantic search, one per photo"""
         results = self.semantic_search(context, k=photo_count, category_filter="video_effects")
-        return [r['item'] for r in results]
+        return self._cycle([r['item'] for r in results], photo_count)
 
     def get_relevant_transitions(self, context: str, photo_count: int) -> List[Dict]:
-        """Get relevant transitions using semantic search"""
+        """Get relevant transitions using semantic search, one per photo"""
         results = self.semantic_search(context, k=photo_count, category_filter="transitions")
-        return [r['item'] for r in results]
+        return self._cycle([r['item'] for r in results], photo_count)
 
     def get_relevant_music(self, context: str) -> Dict:
         """Get relevant music style using semantic search"""
@@ -418,11 +620,44 @@ class VectorRAGDatabase:
 
     def get_rag_context(self, context: str, photo_count: int) -> Dict[str, Any]:
         """Get complete RAG context using semantic search"""
-        return {
-            'context': context,
-            'photo_count': photo_count,
-            'effects': self.get_relevant_effects(context, photo_count),
-            'transitions': self.get_relevant_transitions(context, photo_count),
-            'music_style': self.get_relevant_music(context),
-            'template': self.get_relevant_template(context)
-        }
+        return self.get_rag_context_batch([context], [photo_count])[0]
+
+    def get_rag_context_batch(self, contexts: List[str], photo_counts: List[int]) -> List[Dict[str, Any]]:
+        """
+        Get complete RAG contexts for many uploads at once.
+
+        Each distinct context is encoded once, in a single encoder call, and
+        each category index is searched once with every query row, instead
+        of one encode and one search per category per context.
+        """
+        queries = list(dict.fromkeys(contexts))
+        rows = {query: row for row, query in enumerate(queries)}
+        k = max(photo_counts, default=1)
+        
+        try:
+            query_embeddings = self._encode_queries(queries)
+            hits = {
+                category: self._search_category(category, query_embeddings, k if category in ("video_effects", "transitions") else 1)
+                for category in ("video_effects", "transitions", "music_styles", "video_templates")
+            }
+        except Exception as e:
+            print(f"Error in batch semantic search: {str(e)}")
+            hits = {}
+        
+        def items(category, context, count):
+            results = hits.get(category, {})
+            return [r['item'] for r in results[rows[context]][:count]] if results else []
+        
+        rag_contexts = []
+        for context, photo_count in zip(contexts, photo_counts):
+            music = items("music_styles", context, 1)
+            template = items("video_templates", context, 1)
+            rag_contexts.append({
+                'context': context,
+                'photo_count': photo_count,
+                'effects': self._cycle(items("video_effects", context, photo_count), photo_count),
+                'transitions': self._cycle(items("transitions", context, photo_count), photo_count),
+                'music_style': music[0] if music else self.database["music_styles"][0],  # Default fallback
+                'template': template[0] if template else self.database["video_templates"][0]  # Default fallback
+            })
+        return rag_contexts
@@ -147,7 +147,9 @@ class MemoryVideoCreator {
                 throw new Error('Video generation failed');
             }
 
-            const videoData = await videoResponse.json();
+            // Rendering runs as a background job; poll until it finishes
+            const job = await videoResponse.json();
+            const videoData = await this.waitForRenderJob(job);
             this.updateProgress(100, 'Video created successfully!');
 
             // Show results
@@ -162,6 +164,34 @@ class MemoryVideoCreator {
         }
     }
 
+    async waitForRenderJob(job) {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 2000));
+
+            const statusResponse = await fetch(job.status_url);
+            if (!statusResponse.ok) {
+                throw new Error('Could not check video status');
+            }
+
+            const status = await statusResponse.json();
+            if (status.status === 'failed') {
+                throw new Error(status.error || 'Video generation failed');
+            }
+            if (status.status === 'completed') {
+                break;
+            }
+
+            const stage = status.status === 'queued' ? 'Waiting for a render slot...' : `Creating video (${status.stage})...`;
+            this.updateProgress(50 + status.progress / 2, stage);
+        }
+
+        const resultResponse = await fetch(job.result_url);
+        if (!resultResponse.ok) {
+            throw new Error('Video generation failed');
+        }
+        return resultResponse.json();
+    }
+
     showProcessingSection() {
         document.getElementById('uploadSection').style.display = 'none';
         document.getElementById('resultsSection').style.display = 'none';
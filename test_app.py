@@ -7,6 +7,7 @@ This script demonstrates the core functionality of the app
 import requests
 import os
 import json
+import time
 from PIL import Image
 import io
 
@@ -16,6 +17,17 @@ def create_test_image(filename, color=(255, 0, 0), size=(800, 600)):
     img.save(filename)
     return filename
 
+def wait_for_video(base_url, job, timeout=600):
+    """Poll a render job until it finishes and return its result response"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = requests.get(f"{base_url}{job['status_url']}").json()
+        print(f"   - Job {job['job_id']}: {status.get('status')} ({status.get('progress', 0)}%)")
+        if status.get('status') in ('completed', 'failed'):
+            break
+        time.sleep(2)
+    return requests.get(f"{base_url}{job['result_url']}")
+
 def test_app():
     """Test the Memory Video Creator app"""
     base_url = "http://localhost:5002"
@@ -75,6 +87,9 @@ def test_app():
                                              'video_plan': data.get('video_plan', {})
                                          })
             
+            if video_response.status_code == 202:
+                video_response = wait_for_video(base_url, video_response.json())
+            
             if video_response.status_code == 200:
                 video_data = video_response.json()
                 print("✅ Video generated successfully!")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test the persistent caption cache without loading any models
+"""
+
+import os
+import tempfile
+import numpy as np
+from services.caption_cache import CaptionCache
+from services.content_hash import sha256_file
+
+def test_caption_cache():
+    """Check round trips, model versioning, LRU eviction and persistence"""
+    print("🗄️  Testing Caption Cache")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'captions.sqlite3')
+        cache = CaptionCache(db_path=db_path, max_entries=2)
+
+        # 1. Identical bytes hash the same, regardless of file name
+        print("1. Hashing photo content...")
+        first = os.path.join(tmp, 'a.jpg')
+        second = os.path.join(tmp, 'copy_of_a.jpg')
+        for path in (first, second):
+            with open(path, 'wb') as f:
+                f.write(b'not really a jpeg, but the bytes are what count')
+        assert sha256_file(first) == sha256_file(second)
+        print("   ✅ Renamed copy has the same content hash")
+
+        # 2. Round trip with an embedding
+        print("\n2. Storing and reading an entry...")
+        embedding = np.random.rand(512).astype(np.float32)
+        cache.put('hash-a', 'blip+clip', 'v1', {'caption': 'a dog on a beach', 'scene': 'a nature landscape view', 'embedding': embedding})
+        entry = cache.get('hash-a', 'blip+clip', 'v1')
+        assert entry['caption'] == 'a dog on a beach'
+        assert np.array_equal(entry['embedding'], embedding)
+        print("   ✅ Caption, scene and embedding survive the round trip")
+
+        # 3. A different model version misses
+        print("\n3. Checking model versioning...")
+        assert cache.get('hash-a', 'blip+clip', 'v2') is None
+        print("   ✅ New model version does not reuse old captions")
+
+        # 4. Least recently used entry is evicted
+        print("\n4. Checking LRU eviction...")
+        cache.put('hash-b', 'blip+clip', 'v1', {'caption': 'b'})
+        cache.get('hash-a', 'blip+clip', 'v1')
+        cache.put('hash-c', 'blip+clip', 'v1', {'caption': 'c'})
+        assert cache.get('hash-b', 'blip+clip', 'v1') is None
+        assert cache.get('hash-a', 'blip+clip', 'v1') is not None
+        print("   ✅ Oldest entry dropped once max_entries is reached")
+
+        stats = cache.stats()
+        print(f"   📊 {stats}")
+        assert stats['entries'] == 2
+
+        # 5. Entries persist across instances
+        print("\n5. Reopening the cache...")
+        cache.close()
+        reopened = CaptionCache(db_path=db_path, max_entries=2)
+        assert reopened.get('hash-c', 'blip+clip', 'v1')['caption'] == 'c'
+        reopened.close()
+        print("   ✅ Cached captions survive a restart")
+
+    print("\n" + "=" * 50)
+    print("🎉 Caption cache test completed!")
+
+if __name__ == "__main__":
+    test_caption_cache()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test the ffmpeg pipe slideshow renderer
+"""
+
+import os
+import tempfile
+import numpy as np
+from moviepy import VideoFileClip
+from services.ffmpeg_renderer import FFmpegSlideshowRenderer
+
+def test_ffmpeg_renderer():
+    """Check fades, slides, crossfades and an end-to-end encode"""
+    print("🎞️  Testing FFmpeg Slideshow Renderer")
+    print("=" * 50)
+
+    size = (320, 180)
+    red = np.zeros((180, 320, 3), dtype=np.uint8)
+    red[..., 0] = 200
+    blue = np.zeros_like(red)
+    blue[..., 2] = 200
+
+    renderer = FFmpegSlideshowRenderer(size=size, fps=10)
+    shots = [renderer._prepare_shot(shot) for shot in [
+        {'frame': red, 'start': 0, 'duration': 3, 'motion': ('static',), 'transition': ('fade', 1.0, 0)},
+        {'frame': blue, 'start': 2, 'duration': 3, 'crossfade': 1.0, 'motion': ('zoom', 1.0, 1.2, (0.5, 0.5), (0.5, 0.5)), 'transition': ('slide', 100, 0)}
+    ]]
+
+    # 1. Fade in scales the frame towards black
+    print("1. Composing frames...")
+    assert renderer.compose(shots, 0.5)[90, 160].tolist() == [100, 0, 0]
+    # A still frame outside any fade is passed through without copying
+    assert renderer.compose(shots, 1.5) is shots[0]['source']
+    print("   ✅ Fade in, untouched still frame")
+
+    # 2. Overlapping shots crossfade
+    mid = renderer.compose(shots, 2.5)[90, 160]
+    assert abs(int(mid[0]) - 100) <= 1 and abs(int(mid[2]) - 100) <= 1, mid
+    print("   ✅ Crossfade halfway between neighbours")
+
+    # 3. Slides move the frame over black
+    frame = renderer.compose(shots, 4.0)
+    assert frame[90, :150].max() == 0 and frame[90, 250, 2] == 200
+    print("   ✅ Slide shifted 200px right")
+
+    # 4. End-to-end encode through ffmpeg
+    print("\n2. Encoding through ffmpeg...")
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, 'slideshow.mp4')
+        progress = []
+        renderer.render([
+            {'frame': red, 'start': 0, 'duration': 3, 'motion': ('pan', 'left', 0.15)},
+            {'frame': blue, 'start': 2, 'duration': 3, 'crossfade': 1.0, 'motion': ('static',), 'transition': ('fade', 0, 1.0)}
+        ], output_path, progress_callback=progress.append)
+
+        clip = VideoFileClip(output_path)
+        assert tuple(clip.size) == size
+        assert abs(clip.duration - 5.0) < 0.2, clip.duration
+        assert clip.get_frame(4.0)[90, 160, 2] > 150
+        clip.close()
+        assert progress[-1] == 1.0
+        print(f"   ✅ {clip.duration:.1f}s at {size[0]}x{size[1]}")
+
+        # 5. Segment-parallel encode joins to the same timeline
+        print("\n3. Encoding photo segments in parallel...")
+        parallel = FFmpegSlideshowRenderer(size=size, fps=10, segment_workers=2)
+        segment_shots = [
+            {'frame': red, 'start': 0, 'duration': 3, 'motion': ('static',)},
+            {'frame': blue, 'start': 2, 'duration': 3, 'crossfade': 1.0, 'motion': ('static',)},
+            {'frame': red, 'start': 4, 'duration': 3, 'crossfade': 1.0, 'motion': ('zoom', 1.2, 1.0, (0.5, 0.5), (0.5, 0.5))}
+        ]
+        assert parallel.segment_bounds(segment_shots, 70) == [(0, 20), (20, 40), (40, 70)]
+        output_path = os.path.join(tmp, 'segments.mp4')
+        parallel.render(segment_shots, output_path)
+
+        clip = VideoFileClip(output_path)
+        assert abs(clip.duration - 7.0) < 0.2, clip.duration
+        assert clip.get_frame(3.5)[90, 160, 2] > 150
+        clip.close()
+        assert not [name for name in os.listdir(tmp) if name.startswith('segments-')], "Segment files should be removed"
+        print(f"   ✅ 3 segments joined into {clip.duration:.1f}s")
+
+    print("\n" + "=" * 50)
+    print("🎉 FFmpeg renderer test completed!")
+
+if __name__ == "__main__":
+    test_ffmpeg_renderer()
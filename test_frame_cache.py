@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the normalized frame cache (memory LRU + memory-mapped .npy files)
+"""
+
+import os
+import tempfile
+import numpy as np
+from PIL import Image
+from services.frame_cache import FrameCache
+
+def test_frame_cache():
+    """Check letterboxed frames, memory/disk hits, mmap reuse and eviction"""
+    print("🧊 Testing Frame Cache")
+    print("=" * 50)
+
+    size = (320, 180)
+    frame_bytes = size[0] * size[1] * 3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        photos = []
+        for i, color in enumerate([(255, 0, 0), (0, 255, 0), (0, 0, 255)]):
+            path = os.path.join(tmp, f"photo_{i}.png")
+            Image.new('RGB', (400, 400), color=color).save(path)
+            photos.append(path)
+
+        folder = os.path.join(tmp, 'frames')
+        working = os.path.join(tmp, 'working')
+        cache = FrameCache(cache_folder=folder, max_memory_bytes=2 * frame_bytes, max_disk_bytes=10 * frame_bytes, working_folder=working)
+
+        # 1. First request decodes and letterboxes
+        print("1. Building a normalized frame...")
+        frame = cache.get_frame(photos[0], size)
+        assert frame.shape == (180, 320, 3) and frame.dtype == np.uint8
+        assert frame[90, 0].tolist() == [0, 0, 0], "Square photo should be pillarboxed"
+        assert frame[90, 160].tolist() == [255, 0, 0]
+        assert not frame.flags.writeable
+        print("   ✅ 320x180 letterboxed, read-only")
+
+        # 2. Repeat lookups are served from memory
+        assert cache.get_frame(photos[0], size) is frame
+        assert cache.stats()['memory_hits'] == 1
+
+        # 3. Memory budget evicts the least recently used frame
+        print("\n2. Filling the memory budget...")
+        cache.get_frame(photos[1], size)
+        cache.get_frame(photos[2], size)
+        stats = cache.stats()
+        assert stats['memory_frames'] == 2 and stats['memory_bytes'] <= 2 * frame_bytes
+        print(f"   ✅ {stats}")
+
+        # 4. A fresh cache (another render) maps the frames from disk
+        print("\n3. Reopening from disk...")
+        reopened = FrameCache(cache_folder=folder, max_memory_bytes=2 * frame_bytes, max_disk_bytes=10 * frame_bytes, working_folder=working)
+        mapped = reopened.get_frame(photos[0], size)
+        assert isinstance(mapped, np.memmap)
+        assert np.array_equal(mapped, frame)
+        assert reopened.stats()['disk_hits'] == 1
+        print("   ✅ Frame memory-mapped without decoding again")
+
+        # 5. A different resolution is a different entry
+        assert cache.get_frame(photos[0], (160, 90)).shape == (90, 160, 3)
+
+        # 6. Large-album renders map frames without filling the memory tier
+        print("\n4. Mapping frames for a render...")
+        fresh = FrameCache(cache_folder=folder, max_memory_bytes=2 * frame_bytes, max_disk_bytes=10 * frame_bytes, working_folder=working)
+        mapped = fresh.get_frame(photos[1], size, remember=False)
+        assert isinstance(mapped, np.memmap) and not mapped.flags.writeable
+        decoded = fresh.get_frame(photos[0], (240, 135), remember=False)
+        assert isinstance(decoded, np.memmap), "A fresh decode is served from its .npy file"
+        assert fresh.stats()['memory_frames'] == 0
+        print("   ✅ Frames mapped from .npy files, memory tier untouched")
+
+    print("\n" + "=" * 50)
+    print("🎉 Frame cache test completed!")
+
+if __name__ == "__main__":
+    test_frame_cache()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test the shared model registry with dummy loaders (no weights downloaded)
+"""
+
+import time
+import threading
+from services.model_registry import ModelRegistry
+
+def test_model_registry():
+    """Check load-once sharing, background warm-up, readiness and failures"""
+    print("📦 Testing Model Registry")
+    print("=" * 50)
+
+    registry = ModelRegistry()
+    load_count = {'slow': 0}
+
+    def load_slow():
+        load_count['slow'] += 1
+        time.sleep(0.2)
+        return {'weights': 'slow model'}
+
+    def load_broken():
+        raise RuntimeError("weights missing")
+
+    registry.register('slow', load_slow)
+    registry.register('broken', load_broken)
+
+    # 1. Nothing loads at registration
+    print("1. Checking lazy registration...")
+    assert load_count['slow'] == 0
+    assert not registry.is_ready(['slow'])
+    assert registry.status()['slow']['state'] == 'registered'
+    print("   ✅ Registering a model does not load it")
+
+    # 2. Warm-up runs in the background and concurrent callers share one load
+    print("\n2. Checking background warm-up...")
+    registry.warm_up(['slow'])
+    results = []
+    callers = [threading.Thread(target=lambda: results.append(registry.get('slow'))) for _ in range(4)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    assert load_count['slow'] == 1, f"Loaded {load_count['slow']} times"
+    assert all(result is results[0] for result in results)
+    assert registry.is_ready(['slow'])
+    info = registry.status()['slow']
+    assert info['state'] == 'loaded' and info['load_seconds'] >= 0.2
+    print(f"   ✅ Loaded once in {info['load_seconds']}s and shared by {len(results)} callers")
+
+    # 3. Failed loads are reported, not hidden
+    print("\n3. Checking failed loads...")
+    try:
+        registry.get('broken')
+        assert False, "Broken loader should raise"
+    except RuntimeError:
+        pass
+    assert registry.status()['broken']['state'] == 'failed'
+    assert not registry.is_ready()
+    print("   ✅ Failure recorded in status and readiness stays false")
+
+    print("\n" + "=" * 50)
+    print("🎉 Model registry test completed!")
+
+if __name__ == "__main__":
+    test_model_registry()
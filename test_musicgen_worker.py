@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test background MusicGen generation with a dummy model (no weights downloaded)
+"""
+
+import os
+import tempfile
+import numpy as np
+from services.musicgen_worker import MusicGenWorker
+
+def test_musicgen_worker():
+    """Check non-blocking misses, chunk continuation, bucketing, the disk cache and failure backoff"""
+    print("🎼 Testing MusicGen Worker")
+    print("=" * 50)
+
+    calls = []
+
+    def fake_chunk(prompt, seconds, audio_prompt=None):
+        # Continue counting samples from the prompt so seams are visible
+        calls.append(None if audio_prompt is None else len(audio_prompt))
+        start = 0 if audio_prompt is None else audio_prompt[-1] + 1
+        return np.arange(start, start + int(seconds * 1000), dtype=np.float32), 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        worker = MusicGenWorker(cache_folder=tmp, chunk_seconds=4, duration_bucket=5, prompt_seconds=0.5, generate_chunk=fake_chunk)
+
+        # 1. A miss returns immediately and queues generation once
+        print("1. Requesting an uncached track...")
+        assert worker.get('calm', 'calm piano', 9.0, context='beach') is None
+        assert worker.get('calm', 'calm piano', 9.5, context='beach') is None, "Same bucket while pending"
+        worker.join()
+        assert worker.errors == {}
+        print(f"   ✅ Render not blocked, generated in {len(calls)} chunks")
+
+        # 2. 10s bucket from 4s chunks: the text prompt, then two continuations of the last 0.5s
+        print("\n2. Serving the continued track...")
+        audio, sampling_rate = worker.get('calm', 'calm piano', 8.0, context='beach')
+        assert calls == [None, 500, 500] and sampling_rate == 1000
+        assert np.array_equal(audio, np.arange(10000, dtype=np.float32)), "Chunks continue without a seam"
+        print("   ✅ 10s track, each chunk continuing the previous one")
+
+        # 3. Another context is another track; a new worker reads the cache from disk
+        assert worker.get('calm', 'calm piano', 8.0, context='city') is None
+        worker.join()
+        assert len([name for name in os.listdir(tmp) if name.endswith('.npy')]) == 2
+        reopened = MusicGenWorker(cache_folder=tmp, chunk_seconds=4, duration_bucket=5, generate_chunk=fake_chunk)
+        audio, sampling_rate = reopened.get('calm', 'calm piano', 10.0, context='beach')
+        assert len(audio) == 10000 and sampling_rate == 1000
+        print("\n3. ✅ Cached per context and reloaded from disk")
+
+        # 4. Client-supplied styles never reach the file system as-is
+        key, _ = worker._key('../../etc/*', 'beach', 8.0)
+        assert '/' not in key and '*' not in key and '..' not in key
+
+        # 5. A failed track is not queued again until the retry window passes
+        failures = []
+
+        def failing_chunk(prompt, seconds, audio_prompt=None):
+            failures.append(prompt)
+            raise RuntimeError("model unavailable")
+
+        failing = MusicGenWorker(cache_folder=tmp, chunk_seconds=4, duration_bucket=5, retry_seconds=60, generate_chunk=failing_chunk)
+        assert failing.get('calm', 'calm piano', 8.0, context='forest') is None
+        failing.join()
+        assert failing.get('calm', 'calm piano', 8.0, context='forest') is None
+        failing.join()
+        assert len(failures) == 1 and failing.errors
+        print("\n4. ✅ Hashed cache keys, failed tracks backed off")
+
+    print("\n" + "=" * 50)
+    print("🎉 MusicGen worker test completed!")
+
+if __name__ == "__main__":
+    test_musicgen_worker()
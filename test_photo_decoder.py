@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test draft decoding and cached 1080p working copies
+"""
+
+import os
+import time
+import tempfile
+import numpy as np
+from PIL import Image
+from services.photo_decoder import PhotoDecoder, decode_photo
+
+def save_large_photo(path, size=(4000, 3000), orientation=None):
+    """Write a noisy JPEG the size of a phone photo"""
+    pixels = np.random.randint(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+    img = Image.fromarray(pixels)
+    exif = Image.Exif()
+    if orientation:
+        exif[274] = orientation
+    img.save(path, 'JPEG', quality=90, exif=exif)
+    return path
+
+def test_photo_decoder():
+    """Check fitted sizes, EXIF rotation and working copy reuse"""
+    print("🖼️  Testing Photo Decoder")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        landscape = save_large_photo(os.path.join(tmp, 'landscape.jpg'))
+        portrait = save_large_photo(os.path.join(tmp, 'portrait.jpg'), orientation=6)
+
+        # 1. Photos are fitted inside 1920x1080 in one resample
+        print("1. Decoding 12 MP photos to 1080p...")
+        start = time.perf_counter()
+        image = decode_photo(landscape, (1920, 1080))
+        elapsed = time.perf_counter() - start
+        assert image.size == (1440, 1080), image.size
+        assert image.mode == 'RGB'
+        print(f"   ✅ Landscape -> {image.size} in {elapsed * 1000:.0f} ms")
+
+        # 2. EXIF orientation is applied before fitting
+        image = decode_photo(portrait, (1920, 1080))
+        assert image.size == (810, 1080), image.size
+        print(f"   ✅ Rotated portrait -> {image.size}")
+
+        # 3. Working copies are written once and reused
+        print("\n2. Caching working copies...")
+        decoder = PhotoDecoder(cache_folder=os.path.join(tmp, 'working'))
+        working_path = decoder.working_copy(landscape)
+        assert os.path.exists(working_path)
+        assert working_path.endswith('_1920x1080.jpg')
+        modified = os.path.getmtime(working_path)
+        assert decoder.working_copy(landscape) == working_path
+        assert os.path.getmtime(working_path) == modified
+        assert decoder.decode(landscape).size == (1440, 1080)
+        print(f"   ✅ {os.path.basename(working_path)[:16]}... reused on the next request")
+
+    print("\n" + "=" * 50)
+    print("🎉 Photo decoder test completed!")
+
+if __name__ == "__main__":
+    test_photo_decoder()
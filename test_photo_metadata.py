@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test header-only metadata indexing and chronological photo ordering
+"""
+
+import os
+import time
+import tempfile
+from PIL import Image
+from services.photo_metadata import PhotoMetadataIndex
+from services.photo_processor import PhotoProcessor
+
+def save_photo(path, color, datetime_original=None, mtime=None):
+    """Write a JPEG, optionally with DateTimeOriginal and a forced modification time"""
+    img = Image.new('RGB', (640, 480), color=color)
+    exif = Image.Exif()
+    if datetime_original:
+        exif.get_ifd(0x8769)[36867] = datetime_original
+    img.save(path, 'JPEG', exif=exif)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+def test_photo_metadata():
+    """Check EXIF parsing, caching and ordering of mixed EXIF/no-EXIF albums"""
+    print("🗂️  Testing Photo Metadata Index")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = PhotoMetadataIndex(max_workers=4)
+        processor = PhotoProcessor()
+        processor.metadata_index = index
+
+        # Taken 2021 (EXIF), file touched in 2022 without EXIF, taken 2020 (EXIF)
+        mid = time.mktime((2022, 5, 1, 12, 0, 0, 0, 0, -1))
+        photos = [
+            save_photo(os.path.join(tmp, 'b.jpg'), (255, 0, 0), "2021:08:01 10:00:00"),
+            save_photo(os.path.join(tmp, 'c.jpg'), (0, 255, 0), mtime=mid),
+            save_photo(os.path.join(tmp, 'a.jpg'), (0, 0, 255), "2020:01:01 09:30:00"),
+        ]
+
+        # 1. Header fields are read without decoding
+        print("1. Reading photo headers...")
+        metadata = index.get_many(photos)
+        assert metadata[0]['datetime_original'] == "2021:08:01 10:00:00"
+        assert metadata[1]['timestamp'] is None
+        assert (metadata[2]['width'], metadata[2]['height']) == (640, 480)
+        assert index.get(photos[0]) is metadata[0], "Second lookup should hit the cache"
+        print("   ✅ DateTimeOriginal, dimensions and cache reuse")
+
+        # 2. EXIF dates and file times sort together (used to raise TypeError)
+        print("\n2. Ordering a mixed album...")
+        ordered = processor.order_photos(photos)
+        assert [os.path.basename(p) for p in ordered] == ['a.jpg', 'b.jpg', 'c.jpg'], ordered
+        print(f"   ✅ {[os.path.basename(p) for p in ordered]}")
+
+        # 3. Unreadable files do not break ordering
+        print("\n3. Ordering with a broken file...")
+        broken = os.path.join(tmp, 'broken.jpg')
+        with open(broken, 'wb') as f:
+            f.write(b'not an image')
+        ordered = processor.order_photos(photos + [broken])
+        assert len(ordered) == 4
+        print("   ✅ Broken file falls back to its modification time")
+
+    print("\n" + "=" * 50)
+    print("🎉 Photo metadata test completed!")
+
+if __name__ == "__main__":
+    test_photo_metadata()
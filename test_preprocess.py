@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test the parallel photo preprocessing stage
+"""
+
+import os
+import tempfile
+from PIL import Image
+from services.preprocess import PhotoPreprocessor
+from services.frame_cache import FrameCache
+
+def test_preprocess():
+    """Check ordering, letterboxed output, caching and per-photo errors"""
+    print("⚙️  Testing Photo Preprocessor")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        photos = []
+        for i, (size, color) in enumerate([((3000, 2000), (255, 0, 0)), ((1000, 2000), (0, 255, 0)), ((1920, 1080), (0, 0, 255))]):
+            path = os.path.join(tmp, f"photo_{i}.jpg")
+            Image.new('RGB', size, color=color).save(path, 'JPEG')
+            photos.append(path)
+        broken = os.path.join(tmp, 'broken.jpg')
+        with open(broken, 'wb') as f:
+            f.write(b'not an image')
+
+        preprocessor = PhotoPreprocessor(max_workers=2, output_folder=os.path.join(tmp, 'frames'), working_folder=os.path.join(tmp, 'working'))
+        try:
+            # 1. Results come back in input order as 1920x1080 frames
+            print("1. Preprocessing on a process pool...")
+            results = preprocessor.run(photos + [broken], return_frames=True)
+            assert [r['photo'] for r in results] == photos + [broken]
+            for result in results[:3]:
+                assert result['error'] is None, result['error']
+                assert result['frame'].shape == (1080, 1920, 3)
+            # Portrait photo is pillarboxed: black edges, green centre
+            assert results[1]['frame'][540, 0].tolist() == [0, 0, 0]
+            assert results[1]['frame'][540, 960, 1] > 200
+            assert results[3]['error'], "Broken file should report an error"
+            print("   ✅ Ordered, letterboxed, broken file reported without failing the batch")
+
+            # 2. Second run reuses the normalized files
+            print("\n2. Preprocessing again...")
+            results = preprocessor.run(photos)
+            assert all(r['cached'] for r in results)
+            print(f"   ✅ All cached, slowest {max(r['seconds'] for r in results) * 1000:.0f} ms")
+
+            # 3. The frame cache maps the preprocessed files instead of decoding
+            cache = FrameCache(cache_folder=os.path.join(tmp, 'frames'), working_folder=os.path.join(tmp, 'working'))
+            cache.get_frame(photos[0])
+            assert cache.stats()['disk_hits'] == 1 and cache.stats()['misses'] == 0
+            print("\n3. ✅ Frame cache served the preprocessed .npy file")
+        finally:
+            preprocessor.shutdown()
+
+    print("\n" + "=" * 50)
+    print("🎉 Preprocessor test completed!")
+
+if __name__ == "__main__":
+    test_preprocess()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test the crossfade timeline layout
+"""
+
+from services.timeline import Timeline
+
+def test_timeline():
+    """Check start times, overlap windows and total duration"""
+    print("🧵 Testing Timeline")
+    print("=" * 50)
+
+    # 1. Straight cuts place clips back to back
+    print("1. Laying out straight cuts...")
+    timeline = Timeline()
+    for name in ['a', 'b', 'c']:
+        timeline.add(name, 4)
+    assert [entry['start'] for entry in timeline] == [0, 4, 8]
+    assert timeline.duration == 12
+    print("   ✅ 3 x 4s = 12s")
+
+    # 2. Crossfades overlap neighbours only during the transition window
+    print("\n2. Laying out 0.5s crossfades...")
+    timeline = Timeline(0.5)
+    for name in ['a', 'b', 'c']:
+        timeline.add(name, 4)
+    assert [entry['start'] for entry in timeline] == [0, 3.5, 7.0]
+    assert [entry['crossfade'] for entry in timeline] == [0, 0.5, 0.5]
+    assert timeline.duration == 11.0, "Each overlap should be counted once"
+    assert [entry['item'] for entry in timeline.active(2.0)] == ['a']
+    assert [entry['item'] for entry in timeline.active(3.75)] == ['a', 'b']
+    print(f"   ✅ {timeline.duration}s, two sources only inside the windows")
+
+    # 3. Overlap never exceeds half of a clip, so at most two clips play at once
+    print("\n3. Capping long transitions...")
+    timeline = Timeline(3)
+    for name in ['a', 'b', 'c']:
+        timeline.add(name, 2)
+    assert [entry['crossfade'] for entry in timeline] == [0, 1.0, 1.0]
+    assert max(len(timeline.active(t / 10)) for t in range(int(timeline.duration * 10))) == 2
+    print("   ✅ Capped at 1s for 2s clips")
+
+    print("\n" + "=" * 50)
+    print("🎉 Timeline test completed!")
+
+if __name__ == "__main__":
+    test_timeline()
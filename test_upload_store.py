@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test streaming ingest, blob IDs and session manifests without running the app
+"""
+
+import io
+import os
+import tempfile
+from PIL import Image
+from services.upload_store import UploadStore
+from services.content_hash import is_blob_id, resolve_photo_path, photo_content_hash
+
+def make_jpeg(color=(200, 30, 30), size=(800, 600), datetime_original="2023:07:14 18:05:00", orientation=6):
+    """Encode a small JPEG carrying DateTimeOriginal and an orientation tag"""
+    img = Image.new('RGB', size, color=color)
+    exif = Image.Exif()
+    exif[274] = orientation
+    exif.get_ifd(0x8769)[36867] = datetime_original
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+def stream_upload(store, filename, data, chunk_size=4096):
+    """Feed bytes to an ingest stream in chunks, the way the multipart parser does"""
+    stream = store.open_stream(filename)
+    for start in range(0, len(data), chunk_size):
+        stream.write(data[start:start + chunk_size])
+    stream.seek(0)
+    return stream
+
+def test_upload_store():
+    """Check hashing while writing, metadata extraction and deduplication"""
+    print("📥 Testing Upload Store")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = UploadStore(root=tmp, header_bytes=64 * 1024)
+        photo = make_jpeg()
+
+        # 1. Streamed upload lands under its content hash with metadata
+        print("1. Streaming a photo into the store...")
+        stream = stream_upload(store, 'IMG_0001.jpg', photo)
+        record = store.commit(stream)
+        stream.close()
+        assert record['blob_id'].endswith('.jpg')
+        assert os.path.exists(store.blob_path(record['blob_id']))
+        assert record['size_bytes'] == len(photo)
+        assert record['datetime_original'] == "2023:07:14 18:05:00"
+        assert record['orientation'] == 6
+        assert tuple(record['oriented_size']) == (600, 800)
+        print(f"   ✅ Stored as {record['blob_id'][:16]}... with EXIF date and rotated size")
+
+        # 2. Same bytes under another name are deduplicated
+        print("\n2. Uploading the same photo again...")
+        stream = stream_upload(store, 'copy.jpg', photo)
+        duplicate = store.commit(stream)
+        stream.close()
+        assert duplicate['blob_id'] == record['blob_id']
+        assert duplicate['duplicate']
+        blobs = [name for name in os.listdir(store.blob_folder) if name.endswith('.jpg')]
+        assert len(blobs) == 1
+        assert not os.listdir(store.temp_folder), "Temp files should be cleaned up"
+        print("   ✅ Stored once, temp file removed")
+
+        # 3. Non-images are rejected and leave nothing behind
+        print("\n3. Uploading a file that is not an image...")
+        stream = stream_upload(store, 'notes.jpg', b'plain text, not a photo')
+        try:
+            store.commit(stream)
+            assert False, "Non-image should be rejected"
+        except ValueError as e:
+            print(f"   ✅ Rejected: {e}")
+        stream.close()
+        assert not os.listdir(store.temp_folder)
+
+        # 4. Session manifests map original names to blobs
+        print("\n4. Recording an upload session...")
+        session_id = store.create_session([{'original_name': 'IMG_0001.jpg', 'blob_id': record['blob_id']}])
+        session = store.get_session(session_id)
+        assert session['photos'][0] == {'original_name': 'IMG_0001.jpg', 'blob_id': record['blob_id']}
+        assert store.get_session('../../etc/passwd') is None
+        print(f"   ✅ Session {session_id[:8]}... maps IMG_0001.jpg to its blob")
+
+        # 5. Blob IDs resolve inside the store; anything else is passed through or rejected
+        print("\n5. Resolving blob IDs...")
+        assert resolve_photo_path(record['blob_id'], root=tmp) == store.blob_path(record['blob_id'])
+        assert resolve_photo_path('test_images/photo.jpg', root=tmp) == 'test_images/photo.jpg'
+        assert photo_content_hash(record['blob_id']) == record['content_hash']
+        for bad_id in ('../config.py', record['blob_id'][:-4] + '.py', 'x' * 64 + '.jpg'):
+            assert not is_blob_id(bad_id)
+            try:
+                store.blob_path(bad_id)
+                assert False, f"{bad_id} should be rejected"
+            except ValueError:
+                pass
+        print("   ✅ Only <sha256>.<ext> IDs map into the blob folder")
+
+    print("\n" + "=" * 50)
+    print("🎉 Upload store test completed!")
+
+if __name__ == "__main__":
+    test_upload_store()
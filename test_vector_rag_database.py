@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test the FAISS-backed RAG database with a dummy sentence embedder (no weights downloaded)
+"""
+
+import os
+import json
+import zlib
+import tempfile
+import numpy as np
+from services.model_registry import model_registry
+from services.vector_rag_database import VectorRAGDatabase
+from services.query_embedding_cache import QueryEmbeddingCache
+
+
+class FakeTensor:
+    def __init__(self, array):
+        self.array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+class FakeEmbedder:
+    """Bag of words hashed into 384 dimensions; counts encoded texts"""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, convert_to_tensor=True):
+        self.encoded += len(texts)
+        vectors = np.full((len(texts), 384), 1e-3, dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().replace(',', ' ').split():
+                vectors[row, zlib.crc32(word.encode()) % 384] += 1.0
+        return FakeTensor(vectors)
+
+
+def test_vector_rag_database():
+    """Check the saved index is reused, and updated incrementally when the database changes"""
+    print("🗂️  Testing Vector RAG Database")
+    print("=" * 50)
+
+    embedder = FakeEmbedder()
+    model_registry.register('sentence_embedder', lambda: embedder)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, 'rag_database.json')
+        index_folder = os.path.join(tmp, 'rag_index')
+        database = VectorRAGDatabase(database_path=database_path, index_folder=index_folder)._create_default_database()
+        with open(database_path, 'w') as f:
+            json.dump(database, f)
+        item_count = sum(len(items) for items in database.values())
+
+        # 1. First start embeds every item and saves the index
+        print("1. Building the index...")
+        rag_db = VectorRAGDatabase(database_path=database_path, index_folder=index_folder)
+        assert rag_db.item_count == item_count and embedder.encoded == item_count
+        for name in ['video_effects.faiss', 'transitions.faiss', 'items.jsonl', 'manifest.json']:
+            assert os.path.exists(os.path.join(index_folder, name)), name
+        print(f"   ✅ {item_count} items embedded and saved")
+
+        # 2. Next start maps the saved index without embedding anything
+        print("\n2. Reopening...")
+        embedder.encoded = 0
+        rag_db = VectorRAGDatabase(database_path=database_path, index_folder=index_folder)
+        assert embedder.encoded == 0 and rag_db.item_count == item_count
+        results = rag_db.semantic_search("romantic couple love", k=3, category_filter="music_styles")
+        assert results and results[0]['item']['name'] == 'romantic', results
+        print(f"   ✅ Loaded without re-embedding, top music: {results[0]['item']['name']}")
+
+        # Filtered searches return k results from their own category only
+        effects = rag_db.semantic_search("family memories", k=5, category_filter="video_effects")
+        assert len(effects) == 5 and all(r['category'] == 'video_effects' for r in effects)
+        assert len(rag_db.get_relevant_transitions("family memories", 12)) == 12, "One transition per photo"
+        print("   ✅ 5 effects from the effects index, transitions cycled to 12 photos")
+
+        # Batched contexts encode each distinct context once
+        query_cache_path = os.path.join(tmp, 'queries.sqlite3')
+        rag_db.query_cache = QueryEmbeddingCache(max_entries=16, db_path=query_cache_path)
+        embedder.encoded = 0
+        batch = rag_db.get_rag_context_batch(["romantic couple love", "family memories", "romantic couple love"], [2, 4, 3])
+        assert embedder.encoded == 2, embedder.encoded
+        assert [len(c['effects']) for c in batch] == [2, 4, 3]
+        assert batch[0]['music_style']['name'] == 'romantic' and batch[2]['music_style'] == batch[0]['music_style']
+        assert rag_db.get_rag_context("family memories", 4) == batch[1]
+        print("   ✅ 3 contexts planned with 2 encodes")
+
+        # Repeated queries, up to case and whitespace, skip the encoder, also after a restart
+        rag_db.query_cache = QueryEmbeddingCache(max_entries=16, db_path=query_cache_path)
+        embedder.encoded = 0
+        rag_db.semantic_search("  Family   MEMORIES ", k=2)
+        rag_db.semantic_search("family memories", k=2)
+        stats = rag_db.query_cache.stats()
+        assert embedder.encoded == 0 and stats['disk_hits'] == 1 and stats['hits'] == 1, stats
+        print(f"   ✅ Query cache hit rate {stats['hit_rate']:.0%}")
+
+        # The disk tier keeps more queries than the memory tier
+        small = QueryEmbeddingCache(max_entries=1, db_path=os.path.join(tmp, 'small.sqlite3'), max_disk_entries=3)
+        for word in ['beach', 'party', 'wedding']:
+            small.put('model', word, np.ones(4, dtype=np.float32))
+        assert small.stats()['entries'] == 1 and small.stats()['disk_entries'] == 3
+        assert small.get('model', 'beach') is not None and small.stats()['disk_hits'] == 1
+
+        # 3. Editing rag_database.json updates the saved index in place
+        print("\n3. Changing the database...")
+        database['music_styles'].append({'name': 'jazzy', 'description': 'Smooth jazz', 'keywords': ['jazz', 'saxophone']})
+        database['video_effects'][0]['description'] += ' with a slow drift'
+        removed = database['transitions'].pop()
+        database['video_templates'][0]['duration_per_photo'] = 7
+        with open(database_path, 'w') as f:
+            json.dump(database, f)
+        embedder.encoded = 0
+        rag_db = VectorRAGDatabase(database_path=database_path, index_folder=index_folder)
+        assert embedder.encoded == 2, "Only the new and the edited item are embedded"
+        assert rag_db.item_count == item_count
+        assert rag_db.semantic_search("jazz saxophone", k=1)[0]['item']['name'] == 'jazzy'
+        transitions = rag_db.semantic_search(removed['name'], k=len(database['transitions']) + 1, category_filter="transitions")
+        assert removed['name'] not in [r['item']['name'] for r in transitions]
+        templates = rag_db.semantic_search(database['video_templates'][0]['name'], k=10, category_filter="video_templates")
+        assert [r['item'] for r in templates if r['item']['name'] == database['video_templates'][0]['name']][0]['duration_per_photo'] == 7
+        print("   ✅ 2 items embedded, 1 removed, metadata refreshed")
+
+        # 4. add_item embeds one item and persists both the database and the index
+        print("\n4. Adding an item...")
+        embedder.encoded = 0
+        rag_db.add_item('music_styles', {'name': 'lofi', 'description': 'Lo-fi beats', 'keywords': ['lofi', 'chill', 'beats']})
+        assert embedder.encoded == 1 and rag_db.item_count == item_count + 1
+        with open(database_path) as f:
+            assert json.load(f)['music_styles'][-1]['name'] == 'lofi'
+        rag_db = VectorRAGDatabase(database_path=database_path, index_folder=index_folder)
+        assert embedder.encoded == 1, "Reopening after add_item embeds nothing"
+        assert rag_db.semantic_search("lofi chill beats", k=1, category_filter="music_styles")[0]['item']['name'] == 'lofi'
+        print("   ✅ lofi added with a single embedding")
+
+    print("\n" + "=" * 50)
+    print("🎉 Vector RAG database test completed!")
+
+if __name__ == "__main__":
+    test_vector_rag_database()
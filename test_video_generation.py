@@ -5,6 +5,7 @@ Test video generation with sound, transitions, and effects
 
 import requests
 import os
+import time
 from PIL import Image
 
 # Configuration
@@ -13,6 +14,17 @@ UPLOAD_URL = f"{BASE_URL}/upload"
 GENERATE_VIDEO_URL = f"{BASE_URL}/generate_video"
 TEST_IMAGE_DIR = "test_images"
 
+def wait_for_video(job, timeout=600):
+    """Poll a render job until it finishes and return its result response"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = requests.get(f"{BASE_URL}{job['status_url']}").json()
+        print(f"   - Job {job['job_id']}: {status.get('status')} ({status.get('progress', 0)}%, {status.get('stage')})")
+        if status.get('status') in ('completed', 'failed'):
+            break
+        time.sleep(2)
+    return requests.get(f"{BASE_URL}{job['result_url']}")
+
 def create_test_image(filename, color=(255, 0, 0), size=(800, 600)):
     """Create test image with specific color and size"""
     if not os.path.exists(TEST_IMAGE_DIR):
@@ -82,6 +94,10 @@ def test_video_generation():
                                json=video_data,
                                headers={'Content-Type': 'application/json'})
         
+        if response.status_code == 202:
+            print(f"   - Render job queued: {response.json()['job_id']}")
+            response = wait_for_video(response.json())
+        
         if response.status_code == 200:
             result = response.json()
             print("✅ Video generated successfully!")